@@ -0,0 +1,42 @@
+"""Compare two benchmark result files stage by stage.
+
+Usage: python benchmarks/compare.py OLD.json NEW.json
+"""
+import json
+import sys
+
+def load(path: str) -> dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def change(old, new) -> str:
+    if not old or new is None:
+        return ''
+    return f"{(new - old) / old * 100:+.1f}%"
+
+def main():
+    if len(sys.argv) != 3:
+        print(__doc__)
+        sys.exit(1)
+
+    old, new = load(sys.argv[1]), load(sys.argv[2])
+    if old.get('params') != new.get('params'):
+        print("Warning: the runs used different parameters")
+        for key in sorted(set(old.get('params', {})) | set(new.get('params', {}))):
+            if old['params'].get(key) != new['params'].get(key):
+                print(f"  {key}: {old['params'].get(key)} -> {new['params'].get(key)}")
+
+    print(f"{'stage':<14}{old['commit']:>10}{new['commit']:>10}{'change':>10}"
+          f"{'peak MB':>10}{'peak MB':>10}{'change':>10}")
+    for name in new['stages']:
+        old_stage = old['stages'].get(name, {})
+        new_stage = new['stages'][name]
+        print(f"{name:<14}{old_stage.get('seconds', float('nan')):>10.3f}{new_stage['seconds']:>10.3f}"
+              f"{change(old_stage.get('seconds'), new_stage['seconds']):>10}"
+              f"{old_stage.get('peak_mb', float('nan')):>10.1f}{new_stage.get('peak_mb', float('nan')):>10.1f}"
+              f"{change(old_stage.get('peak_mb'), new_stage.get('peak_mb')):>10}")
+    print(f"{'total':<14}{old['total_seconds']:>10.3f}{new['total_seconds']:>10.3f}"
+          f"{change(old['total_seconds'], new['total_seconds']):>10}")
+
+if __name__ == "__main__":
+    main()
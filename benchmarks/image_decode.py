@@ -0,0 +1,87 @@
+"""Thumbnail decode throughput: full-resolution decode vs JPEG draft decoding, in one process or a pool.
+
+Usage: python benchmarks/image_decode.py [--images N] [--size PX] [--processes N] [--dir IMAGES_DIR]
+
+Without --dir a set of noisy JPEGs is generated in memory; with it every file in the
+folder is used as is.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib.image_fetcher import THUMBNAIL_SIZE, decode_thumbnail
+
+def synthetic_images(count: int, size: int):
+    images = []
+    for idx in range(count):
+        rnd = random.Random(idx)
+        img = Image.radial_gradient('L').resize((size, size)).convert('RGB')
+        pixels = img.load()
+        for _ in range(size * 10):
+            pixels[rnd.randrange(size), rnd.randrange(size)] = tuple(rnd.randrange(256) for _ in range(3))
+        buffer = BytesIO()
+        img.save(buffer, 'JPEG', quality=90)
+        images.append(buffer.getvalue())
+    return images
+
+def folder_images(path: str):
+    images = []
+    for name in sorted(os.listdir(path)):
+        with open(os.path.join(path, name), 'rb') as f:
+            images.append(f.read())
+    return images
+
+def full_decode(data: bytes) -> Image.Image:
+    # Every pixel decoded, then resized; what the thumbnail costs without any draft
+    img = Image.open(BytesIO(data))
+    img.load()
+    img.thumbnail(THUMBNAIL_SIZE, Image.Resampling.LANCZOS, reducing_gap=None)
+    return img
+
+def thumbnail_only(data: bytes) -> Image.Image:
+    # The previous fetcher: Image.thumbnail's own draft uses its default reducing_gap
+    img = Image.open(BytesIO(data))
+    img.thumbnail(THUMBNAIL_SIZE, Image.Resampling.LANCZOS)
+    return img
+
+def rate(images, decode, processes: int = 1) -> float:
+    start = time.perf_counter()
+    if processes > 1:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            list(executor.map(decode, images, chunksize=8))
+    else:
+        for data in images:
+            decode(data)
+    return len(images) / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--images', type=int, default=100)
+    parser.add_argument('--size', type=int, default=2400, help="Edge of the generated JPEGs in pixels")
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--dir', help="Use the images in this folder instead of generated ones")
+    args = parser.parse_args()
+
+    images = folder_images(args.dir) if args.dir else synthetic_images(args.images, args.size)
+    print(f"{len(images)} images, {sum(map(len, images)) / len(images) / 1024:.0f} KB average, "
+          f"{os.cpu_count()} CPUs")
+
+    runs = [
+        ('full decode', full_decode, 1),
+        ('thumbnail only (previous)', thumbnail_only, 1),
+        ('draft decode', decode_thumbnail, 1),
+        (f'draft decode, {args.processes} processes', decode_thumbnail, args.processes),
+    ]
+    print(f"{'method':<36}{'images/s':>10}")
+    for name, decode, processes in runs:
+        print(f"{name:<36}{rate(images, decode, processes):>10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""Local stand-in for the Shopify image CDN with configurable latency and failure rate.
+
+Usage: python benchmarks/image_server.py [--port 8765] [--latency 0.05] [--failure-rate 0.0]
+                                         [--renditions scale|ignore|reject]
+
+Like the CDN, `?width=W&height=H` returns the image scaled to fit that box ("scale").
+"ignore" serves the original regardless and "reject" answers such requests with 404,
+to exercise the client's fallback.
+"""
+import argparse
+import hashlib
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from urllib.parse import parse_qs, urlparse
+from PIL import Image
+
+class ImageServer:
+    """Serves a distinct JPEG per path; `with ImageServer() as server:` runs it on a background thread"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.05,
+                 failure_rate: float = 0.0, image_size: int = 1200, seed: int = 1,
+                 renditions: str = 'scale'):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.image_size = image_size
+        self.renditions = renditions
+        self.random = random.Random(seed)
+        self.images = {}
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'not_modified': 0, 'failures': 0, 'renditions': 0,
+                      'renditions_rejected': 0, 'bytes_sent': 0}
+        self.httpd = ThreadingHTTPServer((host, port), self.handler_class())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def image_for(self, path: str) -> bytes:
+        key = path.split('?')[0]
+        with self.lock:
+            data = self.images.get(key)
+        if data is None:
+            digest = hashlib.md5(key.encode()).digest()
+            rnd = random.Random(digest)
+            img = Image.new('RGB', (self.image_size, self.image_size), tuple(digest[:3]))
+            pixels = img.load()
+            # Some noise so the JPEG decodes like a real product photo rather than a flat color
+            for _ in range(3000):
+                pixels[rnd.randrange(self.image_size), rnd.randrange(self.image_size)] = (rnd.randrange(256),) * 3
+            buffer = BytesIO()
+            img.save(buffer, 'JPEG', quality=90)
+            data = buffer.getvalue()
+            with self.lock:
+                self.images[key] = data
+        return data
+
+    def rendition_for(self, path: str, width: int, height: int) -> bytes:
+        key = f"{path.split('?')[0]}@{width}x{height}"
+        with self.lock:
+            data = self.images.get(key)
+        if data is None:
+            img = Image.open(BytesIO(self.image_for(path)))
+            img.thumbnail((width, height), Image.Resampling.LANCZOS)
+            buffer = BytesIO()
+            img.save(buffer, 'JPEG', quality=90)
+            data = buffer.getvalue()
+            with self.lock:
+                self.images[key] = data
+        return data
+
+    def count(self, key: str, amount: int = 1):
+        with self.lock:
+            self.stats[key] += amount
+
+    def should_fail(self) -> bool:
+        with self.lock:
+            return self.random.random() < self.failure_rate
+
+    def handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                server.count('requests')
+                time.sleep(server.latency)
+
+                if server.should_fail():
+                    server.count('failures')
+                    self.send_response(503)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+                query = parse_qs(urlparse(self.path).query)
+                if 'width' in query and server.renditions == 'reject':
+                    server.count('renditions_rejected')
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+                if 'width' in query and server.renditions == 'scale':
+                    width = int(query['width'][0])
+                    height = int(query.get('height', [server.image_size])[0])
+                    server.count('renditions')
+                    data = server.rendition_for(self.path, width, height)
+                else:
+                    data = server.image_for(self.path)
+                etag = '"%s"' % hashlib.md5(data).hexdigest()
+                if self.headers.get('If-None-Match') == etag:
+                    server.count('not_modified')
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+                server.count('bytes_sent', len(data))
+                self.send_response(200)
+                self.send_header('Content-Type', 'image/jpeg')
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                try:
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client gave up (timeout or time budget) before the image was sent
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> 'ImageServer':
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> 'ImageServer':
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.05, help="Seconds added to every response")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="Share of requests answered with 503")
+    parser.add_argument('--renditions', choices=['scale', 'ignore', 'reject'], default='scale',
+                        help="How ?width=&height= requests are answered")
+    args = parser.parse_args()
+
+    server = ImageServer(args.host, args.port, args.latency, args.failure_rate, renditions=args.renditions)
+    print(f"Serving images on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
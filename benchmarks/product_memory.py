@@ -0,0 +1,87 @@
+"""Memory held by the product catalog: slotted models vs the previous dict-per-row layout.
+
+Usage: python benchmarks/product_memory.py [products.csv ...]
+"""
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib.csv_loader import read_csv_files
+from lib.product_extractor import (ProductExtractor, PRODUCT_COLUMNS, VARIANT_COLUMNS,
+                                   IMAGE_COLUMNS, read_product_csv)
+
+def dict_records(df, fields):
+    keys = list(fields)
+    columns = [df[column].tolist() for column, _ in fields.values()]
+    return [dict(zip(keys, values)) for values in zip(*columns)]
+
+def extract_dict_products(df):
+    # The pre-model layout: one dict per product, variant and image, tags left as one string
+    for fields in (PRODUCT_COLUMNS, VARIANT_COLUMNS, IMAGE_COLUMNS):
+        for column, default in fields.values():
+            if column not in df.columns:
+                df[column] = default
+    df = df[df['Handle'].notna()]
+    status = df['Status']
+    status_ok = status.isna() | (status.astype(str).str.lower() == 'active')
+    first_rows = ~df['Handle'].duplicated()
+    df = df[status_ok & df['Handle'].isin(df.loc[first_rows & status_ok, 'Handle'])]
+    first_rows = ~df['Handle'].duplicated()
+
+    products = {}
+    heads = df[first_rows]
+    for handle, fields in zip(heads['Handle'], dict_records(heads, PRODUCT_COLUMNS)):
+        products[handle] = {'handle': handle, **fields, 'variants': [], 'images': []}
+    variant_rows = df[df['Option1 Value'].notna() | df['Variant SKU'].notna()]
+    for handle, variant in zip(variant_rows['Handle'], dict_records(variant_rows, VARIANT_COLUMNS)):
+        products[handle]['variants'].append(variant)
+    image_rows = df[df['Image Src'].notna() & (first_rows | (df['Image Position'] > 1))]
+    for handle, image in zip(image_rows['Handle'], dict_records(image_rows, IMAGE_COLUMNS)):
+        products[handle]['images'].append(image)
+    return products
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak, elapsed
+
+def main():
+    paths = sys.argv[1:] or sorted(
+        os.path.join("inputs/shopify_product_csv", name)
+        for name in os.listdir("inputs/shopify_product_csv") if name.endswith('.csv')
+    )
+
+    def build_dicts():
+        # The old extractor kept its DataFrame alongside the dicts
+        raw_df = read_csv_files(read_product_csv, paths)
+        return raw_df, extract_dict_products(raw_df.copy())
+
+    def build_models():
+        extractor = ProductExtractor(paths)
+        extractor.extract_products()
+        return extractor
+
+    (_, dicts), dict_bytes, dict_peak, dict_time = measure(build_dicts)
+    extractor, model_bytes, model_peak, model_time = measure(build_models)
+
+    variant_count = sum(len(product.variants) for product in extractor.products.values())
+    print(f"{len(dicts)} products, {variant_count} variants from {len(paths)} file(s)")
+    print(f"{'layout':<10}{'retained MB':>14}{'peak MB':>10}{'seconds':>10}")
+    for label, retained, peak, elapsed in (
+        ('dicts', dict_bytes, dict_peak, dict_time),
+        ('models', model_bytes, model_peak, model_time),
+    ):
+        print(f"{label:<10}{retained / 1e6:>14.1f}{peak / 1e6:>10.1f}{elapsed:>10.2f}")
+
+if __name__ == "__main__":
+    main()
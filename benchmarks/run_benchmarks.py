@@ -0,0 +1,205 @@
+"""Time each stage of a price book run on synthetic data and write the results as JSON.
+
+Usage: python benchmarks/run_benchmarks.py [--products N] [--variants N] [--tags N] [--locales N]
+                                           [--latency S] [--failure-rate R] [--renditions MODE]
+                                           [--config '{"key": value}']
+
+Results land in benchmarks/results/<timestamp>_<commit>.json; compare two runs with
+python benchmarks/compare.py OLD.json NEW.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from benchmarks.image_server import ImageServer
+from benchmarks.synthetic_data import write_dataset, image_path, product_handle, LOCALES
+from generate_pricebook import PriceBookGenerator
+from lib.image_fetcher import CDN_RENDITION_SIZE
+from lib.product_extractor import ProductExtractor
+from lib.run_metrics import max_rss_mb
+
+STAGES = ['load', 'extract', 'group', 'translate', 'fetch_images', 'render', 'save']
+
+class StageTimer:
+    def __init__(self, trace_memory: bool = True):
+        self.trace_memory = trace_memory
+        self.stages = {}
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        yield
+        result = {'seconds': round(time.perf_counter() - start, 4)}
+        if self.trace_memory:
+            result['peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 1e6, 2)
+        self.stages[name] = result
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return 'unknown'
+
+def run_stages(config: dict, timer: StageTimer) -> dict:
+    generator = PriceBookGenerator(config=config)
+    input_files = generator.get_input_files()
+
+    with timer.stage('load'):
+        generator.product_extractor = ProductExtractor(
+            input_files['products'], max_workers=config.get('parse_processes')
+        )
+        generator.product_extractor.load_data()
+
+    with timer.stage('extract'):
+        products = generator.product_extractor.extract_products()
+
+    with timer.stage('group'):
+        grouped_products = generator.get_grouped_products()
+
+    # Translation export load plus one name lookup per rendered product
+    with timer.stage('translate'):
+        locales = generator.get_translation_locales()
+        if input_files['translations'] and locales:
+            generator.load_translations(input_files['translations'], locales)
+        for section in grouped_products.values():
+            for product in section:
+                generator.get_product_name(product)
+
+    with timer.stage('fetch_images'):
+        generator.prefetch_images(grouped_products)
+
+    with timer.stage('render'):
+        generator.build_workbook(grouped_products)
+
+    output_file = os.path.join("outputs", "pricebook.xlsx")
+    os.makedirs("outputs", exist_ok=True)
+    with timer.stage('save'):
+        generator.sheet.save(output_file)
+
+    generator.image_fetcher.close()
+    return {
+        'products': len(products),
+        'variants': sum(len(product.variants) for product in products.values()),
+        'sections': len(grouped_products),
+        'section_products': sum(len(section) for section in grouped_products.values()),
+        'images_loaded': sum(1 for img in generator.image_fetcher.thumbnails.values() if img is not None),
+        'output_bytes': os.path.getsize(output_file),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--products', type=int, default=500)
+    parser.add_argument('--variants', type=int, default=3, help="Average variants per product")
+    parser.add_argument('--tags', type=int, default=2, help="Tags per product")
+    parser.add_argument('--locales', type=int, default=1, help=f"Translated locales (up to {len(LOCALES)})")
+    parser.add_argument('--images', type=int, default=2, help="Images per product")
+    parser.add_argument('--files', type=int, default=1, help="Split the product export over this many files")
+    parser.add_argument('--latency', type=float, default=0.02, help="Image server delay per request, seconds")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="Share of image requests that fail")
+    parser.add_argument('--renditions', choices=['scale', 'ignore', 'reject'], default='scale',
+                        help="How the image server answers resized (?width=) requests")
+    parser.add_argument('--config', default='{}', help="JSON object merged into the generator config")
+    parser.add_argument('--no-memory', action='store_true', help="Skip tracemalloc for undisturbed timings")
+    parser.add_argument('--output', help="Results file (default benchmarks/results/<timestamp>_<commit>.json)")
+    parser.add_argument('--keep', action='store_true', help="Keep the temporary work directory")
+    parser.add_argument('--verbose', action='store_true', help="Show the generator's progress output")
+    args = parser.parse_args()
+
+    with open(os.path.join(REPO_DIR, "config.json"), 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    config.update({
+        'target_tag': [],
+        'target_language': ['default'] + LOCALES[:args.locales],
+        'logo': os.path.join(REPO_DIR, config.get('logo', '')) if config.get('logo') else '',
+        # Every run starts cold unless --config turns a cache back on
+        'image_cache_dir': '',
+        'catalog_store': '',
+    })
+    config.update(json.loads(args.config))
+    # The stand-in CDN serves from a thread of this process, and forking a worker pool from a
+    # threaded process is unsafe, so images are decoded in the download threads and CSVs parsed in turn
+    config.update({'image_decode_processes': 1, 'parse_processes': 1})
+
+    commit = git_commit()
+    work_dir = tempfile.mkdtemp(prefix="pricebook_bench_")
+    previous_dir = os.getcwd()
+    timer = StageTimer(trace_memory=not args.no_memory)
+
+    try:
+        with ImageServer(latency=args.latency, failure_rate=args.failure_rate,
+                         renditions=args.renditions) as server:
+            dataset = write_dataset(work_dir, args.products, args.variants, args.tags, args.locales,
+                                    args.images, args.files, server.base_url)
+
+            # Encode the main images up front so fetch timings measure the client, not the stand-in
+            for idx in range(args.products):
+                server.image_for(image_path(product_handle(idx), 1))
+                if args.renditions == 'scale':
+                    server.rendition_for(image_path(product_handle(idx), 1), *CDN_RENDITION_SIZE)
+            os.chdir(work_dir)
+
+            if timer.trace_memory:
+                tracemalloc.start()
+            start = time.perf_counter()
+            output = None if args.verbose else io.StringIO()
+            with contextlib.redirect_stdout(output) if output else contextlib.nullcontext():
+                counts = run_stages(config, timer)
+            total_seconds = time.perf_counter() - start
+            if timer.trace_memory:
+                tracemalloc.stop()
+            server_stats = dict(server.stats)
+    finally:
+        os.chdir(previous_dir)
+        if not args.keep:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    results = {
+        'commit': commit,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'cpus': os.cpu_count(),
+        'params': {key: value for key, value in vars(args).items()
+                   if key not in ('output', 'keep', 'verbose')},
+        'dataset': dataset,
+        'stages': timer.stages,
+        'total_seconds': round(total_seconds, 4),
+        'max_rss_mb': max_rss_mb(),
+        'counts': counts,
+        'image_server': server_stats,
+    }
+
+    output_file = args.output or os.path.join(
+        REPO_DIR, "benchmarks", "results", f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{commit}.json"
+    )
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+
+    print(f"{'stage':<14}{'seconds':>10}{'peak MB':>10}")
+    for name in STAGES:
+        stage = timer.stages.get(name, {})
+        print(f"{name:<14}{stage.get('seconds', 0):>10.3f}{stage.get('peak_mb', float('nan')):>10.1f}")
+    print(f"{'total':<14}{total_seconds:>10.3f}")
+    print(f"Results written to {output_file}")
+    if work_dir and args.keep:
+        print(f"Work directory kept at {work_dir}")
+
+if __name__ == "__main__":
+    main()
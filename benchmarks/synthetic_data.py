@@ -0,0 +1,195 @@
+"""Synthetic Shopify product and Translate & Adapt exports for benchmarking.
+
+Usage: python benchmarks/synthetic_data.py OUTPUT_DIR [--products N] [--variants N] [--tags N] [--locales N]
+"""
+import argparse
+import csv
+import os
+import random
+from typing import Dict, List
+
+PRODUCT_HEADER = [
+    'Handle', 'Title', 'Body (HTML)', 'Vendor', 'Product Category', 'Type', 'Tags', 'Published',
+    'Option1 Name', 'Option1 Value', 'Option1 Linked To', 'Option2 Name', 'Option2 Value',
+    'Option2 Linked To', 'Option3 Name', 'Option3 Value', 'Option3 Linked To', 'Variant SKU',
+    'Variant Grams', 'Variant Inventory Tracker', 'Variant Inventory Qty', 'Variant Inventory Policy',
+    'Variant Fulfillment Service', 'Variant Price', 'Variant Compare At Price',
+    'Variant Requires Shipping', 'Variant Taxable', 'Variant Barcode', 'Image Src', 'Image Position',
+    'Image Alt Text', 'Gift Card', 'SEO Title', 'SEO Description',
+    'Google Shopping / Google Product Category', 'Google Shopping / Gender',
+    'Google Shopping / Age Group', 'Google Shopping / MPN', 'Google Shopping / Condition',
+    'Google Shopping / Custom Product', 'Color (product.metafields.shopify.color-pattern)',
+    'Material (product.metafields.shopify.material)', 'Variant Image', 'Variant Weight Unit',
+    'Variant Tax Code', 'Cost per item', 'Status',
+]
+
+TRANSLATION_HEADER = [
+    'Type', 'Identification', 'Field', 'Locale', 'Market', 'Status', 'Default content', 'Translated content',
+]
+
+LOCALES = ['zh-CN', 'vi', 'fr', 'es', 'de', 'ja', 'ko', 'pt-BR', 'it', 'nl']
+VENDORS = ['OMECA', 'Harbor Supply', 'Pacific Wares', 'Golden Kitchen']
+TYPES = ['Bowl', 'Plate', 'Cup', 'Container', 'Utensil', 'Bag', 'Tray']
+SIZES = ['S', 'M', 'L', 'XL', '6"', '8"', '10"', '12"', '500ml', '750ml', '1000ml', '1500ml']
+COLORS = ['White', 'Black', 'Red', 'Clear', 'Kraft', 'Blue']
+
+def tag_names(count: int) -> List[str]:
+    return [f"category-{idx:03d}" for idx in range(count)]
+
+def product_handle(idx: int) -> str:
+    return f"product-{idx:06d}"
+
+def image_path(handle: str, position: int) -> str:
+    return f"/products/{handle}-{position}.jpg"
+
+def product_type(idx: int) -> str:
+    return TYPES[idx % len(TYPES)]
+
+def product_title(idx: int) -> str:
+    # Derived from the index alone so the translation export can repeat it
+    return f"{COLORS[idx % len(COLORS)]} {product_type(idx)} {idx}"
+
+def write_products(path: str, products: int = 500, variants: int = 3, tags: int = 2, images: int = 2,
+                   image_base_url: str = "http://127.0.0.1:8765", draft_ratio: float = 0.05,
+                   seed: int = 1) -> Dict[str, int]:
+    """Write one product export; returns row counts. Products use `tags` of a pool of tags * 4 tags."""
+    rnd = random.Random(seed)
+    tag_pool = tag_names(max(tags * 4, 8))
+    rows = 0
+
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(PRODUCT_HEADER)
+        for idx in range(products):
+            handle = product_handle(idx)
+            title = product_title(idx)
+            variant_count = max(1, variants + rnd.randint(-1, 1)) if variants > 1 else 1
+            row_count = max(variant_count, images)
+
+            for row_idx in range(row_count):
+                row = dict.fromkeys(PRODUCT_HEADER, '')
+                row['Handle'] = handle
+                if row_idx == 0:
+                    row.update({
+                        'Title': title,
+                        'Body (HTML)': f"<p>{title} for restaurants and takeout.</p>" * rnd.randint(1, 6),
+                        'Vendor': rnd.choice(VENDORS),
+                        'Product Category': 'Home & Garden > Kitchen & Dining',
+                        'Type': product_type(idx),
+                        'Tags': ', '.join(rnd.sample(tag_pool, min(tags, len(tag_pool)))),
+                        'Published': 'true',
+                        'Gift Card': 'false',
+                        'SEO Title': title,
+                        'Status': 'draft' if rnd.random() < draft_ratio else 'active',
+                    })
+                if row_idx < variant_count:
+                    option = SIZES[row_idx % len(SIZES)] if variant_count > 1 else 'Default Title'
+                    row.update({
+                        'Option1 Name': 'Size' if variant_count > 1 else 'Title',
+                        'Option1 Value': option,
+                        'Variant SKU': f"SKU{idx:06d}-{row_idx}",
+                        'Variant Grams': rnd.randint(50, 5000),
+                        'Variant Inventory Tracker': 'shopify',
+                        'Variant Inventory Qty': rnd.randint(0, 500),
+                        'Variant Inventory Policy': 'deny',
+                        'Variant Fulfillment Service': 'manual',
+                        'Variant Price': f"{rnd.uniform(1, 300):.2f}",
+                        'Variant Requires Shipping': 'true',
+                        'Variant Taxable': 'true',
+                        'Variant Weight Unit': 'kg',
+                    })
+                if row_idx < images:
+                    row.update({
+                        'Image Src': f"{image_base_url}{image_path(handle, row_idx + 1)}?v={seed}",
+                        'Image Position': row_idx + 1,
+                        'Image Alt Text': title,
+                    })
+                writer.writerow(row.values())
+                rows += 1
+
+    return {'products': products, 'rows': rows}
+
+def write_translations(path: str, products: int = 500, locales: int = 1, collections: int = 20,
+                       seed: int = 1) -> Dict[str, int]:
+    """Write a Translate & Adapt export covering every product in `locales` locales"""
+    rnd = random.Random(seed)
+    rows = 0
+
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(TRANSLATION_HEADER)
+        for idx in range(collections):
+            for locale in LOCALES[:locales]:
+                writer.writerow(['COLLECTION', f"'{290000000000 + idx}", 'title', locale, '', '',
+                                 f"Collection {idx}", f"[{locale}] Collection {idx}"])
+                rows += 1
+
+        for idx in range(products):
+            product_id = f"'{7000000000000 + idx}"
+            handle = product_handle(idx)
+            title = product_title(idx)
+            for locale in LOCALES[:locales]:
+                fields = [
+                    ('handle', handle, ''),
+                    ('title', title, f"[{locale}] {title}" if rnd.random() < 0.95 else ''),
+                    ('body_html', f"<p>{title}</p>", f"<p>[{locale}] {title}</p>"),
+                    ('product_type', product_type(idx), ''),
+                ]
+                for field, default, translated in fields:
+                    writer.writerow(['PRODUCT', product_id, field, locale, '', '', default, translated])
+                    rows += 1
+
+    return {'rows': rows}
+
+def write_dataset(output_dir: str, products: int = 500, variants: int = 3, tags: int = 2, locales: int = 1,
+                  images: int = 2, files: int = 1, image_base_url: str = "http://127.0.0.1:8765",
+                  seed: int = 1) -> Dict[str, int]:
+    """Lay out inputs/ the way the generator expects, optionally split over several export files"""
+    product_dir = os.path.join(output_dir, "inputs", "shopify_product_csv")
+    translation_dir = os.path.join(output_dir, "inputs", "shopify_translate_csv")
+    os.makedirs(product_dir, exist_ok=True)
+    os.makedirs(translation_dir, exist_ok=True)
+
+    product_path = os.path.join(product_dir, "products_export_1.csv")
+    stats = write_products(product_path, products, variants, tags, images, image_base_url, seed=seed)
+    if files > 1:
+        split_export(product_path, files)
+    if locales:
+        translation_path = os.path.join(translation_dir, "translations.csv")
+        stats['translation_rows'] = write_translations(translation_path, products, locales, seed=seed)['rows']
+    return stats
+
+def split_export(path: str, files: int):
+    # Shopify cuts exports by row count, so one product's rows may continue in the next file
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        rows = list(reader)
+
+    base = path[:-len("_1.csv")]
+    per_file = -(-len(rows) // files)
+    for idx in range(files):
+        with open(f"{base}_{idx + 1}.csv", 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows[idx * per_file:(idx + 1) * per_file])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('output_dir')
+    parser.add_argument('--products', type=int, default=500)
+    parser.add_argument('--variants', type=int, default=3, help="Average variants per product")
+    parser.add_argument('--tags', type=int, default=2, help="Tags per product")
+    parser.add_argument('--locales', type=int, default=1, help=f"Translated locales (up to {len(LOCALES)})")
+    parser.add_argument('--images', type=int, default=2, help="Images per product")
+    parser.add_argument('--files', type=int, default=1, help="Split the product export over this many files")
+    parser.add_argument('--image-base-url', default="http://127.0.0.1:8765")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    stats = write_dataset(args.output_dir, args.products, args.variants, args.tags, args.locales,
+                          args.images, args.files, args.image_base_url, args.seed)
+    print(f"Wrote {stats} to {args.output_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+import itertools
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from generate_pricebook import PriceBookGenerator, IMAGE_FETCHER_KEYS, render_shard, safe_filename
+
+class PriceBookBatch:
+    """Many price books from one parse of the inputs and one image download.
+
+    Each book is the base config plus its own overrides. Inputs are parsed
+    with every language any book needs, every image any book shows is fetched
+    once, then the workbooks are rendered in parallel worker processes. Books
+    with output_format "html" are written directly and download nothing.
+    """
+
+    def __init__(self, base_config: Dict, books: List[Dict], processes: Optional[int] = None):
+        self.base_config = base_config
+        self.books = books
+        self.processes = processes
+
+    @classmethod
+    def from_file(cls, batch_path: str = "batch.json") -> 'PriceBookBatch':
+        with open(batch_path, 'r', encoding='utf-8') as f:
+            batch = json.load(f)
+        with open(batch.get('config', 'config.json'), 'r', encoding='utf-8') as f:
+            base_config = json.load(f)
+
+        books = list(batch.get('books', []))
+        if batch.get('matrix'):
+            books += expand_matrix(batch['matrix'])
+        return cls(base_config, books, batch.get('processes'))
+
+    def get_book_configs(self) -> List[Tuple[str, Dict]]:
+        book_configs = []
+        names = set()
+        for idx, book in enumerate(self.books, 1):
+            overrides = {key: value for key, value in book.items() if key != 'name'}
+            if overrides.get('sharded_output'):
+                raise ValueError(f"Book {book.get('name') or idx}: sharded_output is not supported in a batch")
+            # Every book uses the shared fetcher, so download settings can only come from the base config
+            fetcher_keys = sorted(set(overrides) & set(IMAGE_FETCHER_KEYS))
+            if fetcher_keys:
+                raise ValueError(f"Book {book.get('name') or idx}: download settings are shared by the batch "
+                                 f"and cannot be set per book: {', '.join(fetcher_keys)}")
+            name = safe_filename(book.get('name') or f"book_{idx}")
+            if name in names:
+                name = f"{name}_{idx}"
+            names.add(name)
+            # Books are always single files, whatever the base config says
+            book_configs.append((name, {**self.base_config, **overrides, 'sharded_output': False}))
+        return book_configs
+
+    def get_shared_config(self, book_configs: List[Tuple[str, Dict]]) -> Dict:
+        # The shared parse loads every locale any book prints
+        languages = []
+        for _, config in book_configs:
+            for lang in config.get('target_language', ['default']):
+                if lang not in languages:
+                    languages.append(lang)
+        return {**self.base_config, 'target_language': languages}
+
+    def generate(self) -> List[str]:
+        book_configs = self.get_book_configs()
+        if not book_configs:
+            raise ValueError("The batch has no books")
+
+        os.makedirs("outputs", exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_dir = f"outputs/batch_{timestamp}"
+        os.makedirs(output_dir, exist_ok=True)
+
+        shared = PriceBookGenerator(config=self.get_shared_config(book_configs))
+        metrics = shared.metrics
+        metrics.reset()
+
+        print("Initializing extractors...")
+        shared.initialize_extractors()
+
+        # Book generators only group and name products here; rendering comes after the shared prefetch
+        books = []
+        with metrics.stage('group'):
+            for name, config in book_configs:
+                generator = PriceBookGenerator(config=config, image_fetcher=shared.image_fetcher)
+                generator.product_extractor = shared.product_extractor
+                generator.translation_extractor = shared.translation_extractor
+                grouped_products = generator.get_grouped_products()
+                print(f"Book {name}: {len(grouped_products)} product groups")
+                extension = 'html' if config.get('output_format', 'xlsx') == 'html' else 'xlsx'
+                books.append((name, generator, grouped_products, os.path.join(output_dir, f"{name}.{extension}")))
+        metrics.count('books', len(books))
+
+        # HTML books link their images, so only workbooks need them downloaded
+        html_books = [book for book in books if book[3].endswith('.html')]
+        workbooks = [book for book in books if not book[3].endswith('.html')]
+        if workbooks:
+            print("Prefetching images...")
+            with metrics.stage('fetch_images'):
+                shared.prefetch_images({
+                    f"{name}/{tag}": products
+                    for name, _, grouped_products, _ in workbooks for tag, products in grouped_products.items()
+                })
+
+        reports = {}
+        if html_books:
+            with metrics.stage('render_html'):
+                for name, generator, grouped_products, output_file in html_books:
+                    generator.render_html(grouped_products, output_file)
+                    reports[output_file] = generator.metrics.to_dict()
+
+        if workbooks:
+            processes = int(self.processes or self.base_config.get('render_processes', 0) or os.cpu_count() or 1)
+            processes = max(1, min(processes, len(workbooks)))
+            print(f"Rendering {len(workbooks)} price books in {processes} processes...")
+            with metrics.stage('render_books'):
+                if processes == 1:
+                    for name, generator, grouped_products, output_file in workbooks:
+                        generator.render_workbook(grouped_products, output_file)
+                        reports[output_file] = generator.metrics.to_dict()
+                else:
+                    with ProcessPoolExecutor(max_workers=processes) as executor:
+                        futures = {
+                            output_file: executor.submit(render_shard, generator.config, grouped_products,
+                                                         *generator.get_render_payload(grouped_products), output_file)
+                            for _, generator, grouped_products, output_file in workbooks
+                        }
+                        for output_file, future in futures.items():
+                            reports[output_file] = future.result()
+
+        metrics.info['books'] = []
+        for name, _, _, output_file in books:
+            report = reports[output_file]
+            metrics.add_counts(report['counters'])
+            metrics.info['books'].append({'name': name, 'file': output_file, 'stages': report['stages']})
+        shared.image_fetcher.close()
+
+        if self.base_config.get('run_report', True):
+            report_file = os.path.join(output_dir, "report.json")
+            metrics.write(report_file)
+            print(f"Run report written to {report_file}")
+
+        output_files = [output_file for _, _, _, output_file in books]
+        print(f"{len(output_files)} price books generated in {output_dir}")
+        return output_files
+
+def expand_matrix(matrix: Dict[str, List]) -> List[Dict]:
+    # {"target_tag": [A, B], "target_language": [X, Y]} -> books A/X, A/Y, B/X, B/Y
+    keys = list(matrix)
+    books = []
+    for values in itertools.product(*(matrix[key] for key in keys)):
+        labels = ['+'.join(map(str, value)) if isinstance(value, list) else str(value) for value in values]
+        books.append({'name': '_'.join(label or 'all' for label in labels), **dict(zip(keys, values))})
+    return books
+
+def main():
+    batch_path = sys.argv[1] if len(sys.argv) > 1 else "batch.json"
+    PriceBookBatch.from_file(batch_path).generate()
+
+if __name__ == "__main__":
+    main()
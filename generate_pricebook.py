@@ -1,57 +1,217 @@
+import base64
 import json
 import os
 import sys
 import pandas as pd
 from datetime import datetime
-import requests
-from io import BytesIO
 from PIL import Image
-from openpyxl import Workbook
 from openpyxl.styles import Font, Alignment, Border, Side, PatternFill, NamedStyle
 from openpyxl.utils import get_column_letter
-from openpyxl.drawing.image import Image as XLImage
 from openpyxl.drawing.xdr import XDRPoint2D, XDRPositiveSize2D
 from openpyxl.utils.units import pixels_to_EMU, cm_to_EMU
-from typing import Dict, List, Optional
+from openpyxl.worksheet.worksheet import Worksheet
+from typing import Dict, List, Optional, Tuple
 import glob
+import hashlib
+import cProfile
+import pstats
+import tracemalloc
+import re
+import shutil
+from concurrent.futures import ProcessPoolExecutor
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from lib.product_extractor import ProductExtractor
-from lib.translation_extractor import TranslationExtractor
+from lib.translation_extractor import TranslationExtractor, PRICE_BOOK_TYPES, PRICE_BOOK_FIELDS
+from lib.image_fetcher import ImageFetcher, encode_image, placeholder_image, resized_image_url
+from lib.html_writer import HtmlCatalogWriter
+from lib.image_cache import ThumbnailCache
+from lib.workbook_writer import BufferedImage
+from lib.sheet_writer import SheetWriter, StreamingSheetWriter
+from lib.sheet_styles import StylePalette, row_position
+from lib.run_manifest import RunManifest, fingerprint, file_fingerprint
+from lib.catalog_store import CatalogStore
+from lib.product_model import Product, Variant
+from lib.run_metrics import RunMetrics
+
+# Config keys that affect how sections are rendered
+RENDER_CONFIG_KEYS = [
+    'company_name', 'phone', 'website', 'address', 'email', 'logo',
+    'target_language', 'image_format', 'image_quality', 'image_placeholder', 'image_cdn_resize',
+    'image_png_optimize'
+]
+
+# Config keys that change the encoded thumbnail bytes
+IMAGE_ENCODING_KEYS = ['image_format', 'image_quality', 'image_placeholder', 'image_png_optimize']
+
+# Config keys read once when the image fetcher is built; generators sharing a fetcher share these
+IMAGE_FETCHER_KEYS = [
+    'image_workers', 'image_timeout', 'image_cache_dir', 'image_cache_max_mb', 'offline_images',
+    'image_retries', 'image_retry_backoff', 'image_host_connections', 'image_failure_threshold',
+    'image_breaker_cooldown', 'image_time_budget', 'image_cdn_resize', 'image_decode_processes'
+]
 
 class PriceBookGenerator:
-    def __init__(self, config_path: str = "config.json"):
-        self.config = self.load_config(config_path)
+    def __init__(self, config_path: str = "config.json", config: Optional[Dict] = None,
+                 image_fetcher: Optional[ImageFetcher] = None):
+        self.config = config if config is not None else self.load_config(config_path)
         self.product_extractor = None
         self.translation_extractor = None
         self.wb = None
         self.ws = None
-        self.temp_images = []  # Store temporary image paths
+        self.sheet = None
+        self.image_data = {}  # Image URL -> encoded thumbnail for this run
+        self.placeholder_data = None
+        self.product_names = {}  # Product handle -> multilingual name for this run
+        self.style_palette = None
+        self.keep_warm = False  # Keep loaded extractors and encoded thumbnails between runs (watch mode)
+        self.metrics = RunMetrics(trace_memory=self.config.get('trace_memory', False))
+        # Generators in a batch share one fetcher and so one set of downloaded thumbnails
+        self.image_fetcher = image_fetcher or self.create_image_fetcher()
 
     def load_config(self, config_path: str) -> Dict:
         with open(config_path, 'r', encoding='utf-8') as f:
             return json.load(f)
 
+    def create_image_fetcher(self) -> ImageFetcher:
+        cache = None
+        cache_dir = self.config.get('image_cache_dir', 'cache/thumbnails')
+        if cache_dir:
+            cache = ThumbnailCache(cache_dir, max_size_mb=self.config.get('image_cache_max_mb', 200))
+
+        return ImageFetcher(
+            max_workers=self.config.get('image_workers', 8),
+            timeout=self.config.get('image_timeout', 10),
+            cache=cache,
+            offline=self.config.get('offline_images', False),
+            metrics=self.metrics,
+            retries=self.config.get('image_retries', 2),
+            backoff=self.config.get('image_retry_backoff', 0.5),
+            host_connections=self.config.get('image_host_connections', 8),
+            failure_threshold=self.config.get('image_failure_threshold', 5),
+            breaker_cooldown=self.config.get('image_breaker_cooldown', 30),
+            time_budget=self.config.get('image_time_budget', 300),
+            cdn_resize=self.config.get('image_cdn_resize', True),
+            decode_processes=self.config.get('image_decode_processes', 0) or os.cpu_count() or 1
+        )
+
+    def create_catalog_store(self) -> Optional[CatalogStore]:
+        store_path = self.config.get('catalog_store', 'cache/catalog.sqlite')
+        return CatalogStore(store_path) if store_path else None
+
+    def get_translation_locales(self) -> List[str]:
+        languages = self.config.get('target_language', ['default'])
+        return [lang for lang in languages if lang and lang != 'default']
+
+    def get_input_files(self) -> Dict[str, List[str]]:
+        # Natural order keeps products_export_10.csv after products_export_9.csv
+        return {
+            'products': sorted(glob.glob("inputs/shopify_product_csv/*.csv"), key=natural_sort_key),
+            'translations': sorted(glob.glob("inputs/shopify_translate_csv/*.csv"), key=natural_sort_key)
+        }
+
     def initialize_extractors(self):
-        product_csv_files = glob.glob("inputs/shopify_product_csv/*.csv")
+        input_files = self.get_input_files()
+        product_csv_files = input_files['products']
         if not product_csv_files:
             raise FileNotFoundError("No product CSV files found in inputs/shopify_product_csv/")
 
-        self.product_extractor = ProductExtractor(product_csv_files[0])
-        self.product_extractor.load_data()
-        self.product_extractor.extract_products()
+        # Only the locales that get printed are loaded from the translation export
+        locales = self.get_translation_locales()
+        translation_csv_files = input_files['translations']
+        load_products = not (self.keep_warm and self.product_extractor)
+        load_translations = bool(translation_csv_files and locales) and not (
+            self.keep_warm and self.translation_extractor
+        )
+        if not translation_csv_files or not locales:
+            self.translation_extractor = None
+
+        store = self.create_catalog_store() if load_products or load_translations else None
+        try:
+            if load_products:
+                with self.metrics.stage('load_products'):
+                    self.load_products(product_csv_files, store)
+                products = self.product_extractor.products
+                self.metrics.count('products_loaded', len(products))
+                self.metrics.count('variants_loaded', sum(len(product.variants) for product in products.values()))
+            else:
+                print("Reusing loaded products")
+
+            if load_translations:
+                with self.metrics.stage('load_translations'):
+                    self.load_translations(translation_csv_files, locales, store)
+            elif self.translation_extractor:
+                print("Reusing loaded translations")
+        finally:
+            if store:
+                store.close()
+
+    def load_products(self, csv_files: List[str], store: Optional[CatalogStore] = None):
+        self.product_extractor = ProductExtractor(csv_files, max_workers=self.config.get('parse_processes'))
+        if store and store.is_current('products', csv_files):
+            print("Loading products from catalog store...")
+            self.product_extractor.set_products(store.load_products())
+            return
+
+        # With csv_chunksize the export is streamed product by product instead of read whole
+        chunksize = self.config.get('csv_chunksize', 0)
+        if not chunksize:
+            self.product_extractor.load_data()
+        products = self.product_extractor.extract_products(chunksize=chunksize)
+        if store:
+            store.save_products(csv_files, products)
+
+    def load_translations(self, csv_files: List[str], locales: List[str], store: Optional[CatalogStore] = None):
+        self.translation_extractor = TranslationExtractor(
+            csv_files,
+            locales=locales,
+            types=PRICE_BOOK_TYPES,
+            fields=PRICE_BOOK_FIELDS,
+            max_workers=self.config.get('parse_processes')
+        )
+
+        # The store only holds the rows the last filter kept, so a different filter means a re-parse
+        options = {
+            'locales': sorted(locales),
+            'types': sorted(PRICE_BOOK_TYPES),
+            'fields': sorted(PRICE_BOOK_FIELDS)
+        }
+        if store and store.is_current('translations', csv_files, options):
+            print("Loading translations from catalog store...")
+            self.translation_extractor.translations = store.load_translations()
+            self.translation_extractor.build_indexes()
+            return
 
-        translation_csv_files = glob.glob("inputs/shopify_translate_csv/*.csv")
-        if translation_csv_files:
-            self.translation_extractor = TranslationExtractor(translation_csv_files[0])
-            self.translation_extractor.load_data()
-            self.translation_extractor.extract_translations()
+        self.translation_extractor.load_data()
+        translations = self.translation_extractor.extract_translations()
+        if store:
+            store.save_translations(csv_files, translations, options)
 
     def create_workbook(self):
-        self.wb = Workbook()
-        self.ws = self.wb.active
-        self.ws.title = "Price List"
+        # The streaming backend writes rows as they are finished instead of holding the whole sheet
+        if self.config.get('streaming_workbook', False):
+            self.sheet = StreamingSheetWriter("Price List")
+        else:
+            self.sheet = SheetWriter("Price List")
+        self.wb = self.sheet.wb
+        self.ws = self.sheet.ws
+
+    def get_style_palette(self) -> StylePalette:
+        # Named styles belong to one workbook, so the palette is rebuilt with it
+        if self.style_palette is None or self.style_palette.wb is not self.wb:
+            self.style_palette = StylePalette(self.wb)
+        return self.style_palette
+
+    def get_contact_lines(self) -> Tuple[str, str]:
+        # Contact line and address line shared by the workbook and HTML headers; address is '' when unset
+        contact_info = f"📞 {self.config.get('phone', '')}  "
+        if self.config.get('email'):
+            contact_info += f"✉️ {self.config.get('email', '')}"
+        if self.config.get('website'):
+            contact_info += f"  🌐 {self.config.get('website', '')}"
+        address = f"📍 {self.config.get('address')}" if self.config.get('address') else ''
+        return contact_info, address
 
     def add_header(self, start_row: int = 1) -> int:
         # Company name styling
@@ -74,76 +234,149 @@ class PriceBookGenerator:
 
                 logo_img.thumbnail((new_width, new_height), Image.Resampling.LANCZOS)
 
-                # Save resized logo temporarily
-                temp_logo = "temp/logo_header.png"
-                os.makedirs("temp", exist_ok=True)
-                logo_img.save(temp_logo)
-                self.temp_images.append(temp_logo)
-
-                # Add logo to Excel
-                xl_logo = XLImage(temp_logo)
-                xl_logo.height = new_height
-                xl_logo.width = new_width
+                # Add logo to Excel straight from memory
+                image_format = self.config.get('image_format', 'png')
+                logo_data = encode_image(logo_img, image_format, self.config.get('image_quality', 80),
+                                         self.config.get('image_png_optimize', False))
+                xl_logo = BufferedImage(logo_data, image_format, new_width, new_height)
 
                 # Position logo in column A
-                self.ws.add_image(xl_logo, f'A{start_row}')
+                self.sheet.add_image(xl_logo, f'A{start_row}')
                 logo_added = True
 
                 # Adjust row height for logo
-                self.ws.row_dimensions[start_row].height = max(45, new_height * 0.75)
+                self.sheet.set_row_height(start_row, max(45, new_height * 0.75))
             except Exception as e:
                 print(f"Could not add logo: {e}")
-                self.ws.row_dimensions[start_row].height = 35
+                self.sheet.set_row_height(start_row, 35)
         else:
-            self.ws.row_dimensions[start_row].height = 35
+            self.sheet.set_row_height(start_row, 35)
 
         # Company Name - always use full width for centering
-        self.ws.merge_cells(f'A{start_row}:E{start_row}')
-        cell = self.ws[f'A{start_row}']
+        self.sheet.merge_cells(f'A{start_row}:E{start_row}')
+        cell = self.sheet.cell(start_row, 1)
         cell.value = self.config.get('company_name', 'Company Name')
         cell.font = company_font
         cell.alignment = Alignment(horizontal='center', vertical='center')
 
         # Add a subtle background
         for col in range(1, 6):
-            self.ws.cell(row=start_row, column=col).fill = PatternFill(
+            self.sheet.cell(start_row, col).fill = PatternFill(
                 start_color="F0F4F8", end_color="F0F4F8", fill_type="solid"
             )
 
         # Contact info
         info_row = start_row + 1
-        self.ws.row_dimensions[info_row].height = 20
-        self.ws.merge_cells(f'A{info_row}:E{info_row}')
-        contact_info = f"📞 {self.config.get('phone', '')}  "
-        if self.config.get('email'):
-            contact_info += f"✉️ {self.config.get('email', '')}"
-        if self.config.get('website'):
-            contact_info += f"  🌐 {self.config.get('website', '')}"
-        self.ws[f'A{info_row}'] = contact_info
-        self.ws[f'A{info_row}'].font = info_font
-        self.ws[f'A{info_row}'].alignment = Alignment(horizontal='center', vertical='center')
+        self.sheet.set_row_height(info_row, 20)
+        self.sheet.merge_cells(f'A{info_row}:E{info_row}')
+        contact_info, address = self.get_contact_lines()
+        cell = self.sheet.cell(info_row, 1, contact_info)
+        cell.font = info_font
+        cell.alignment = Alignment(horizontal='center', vertical='center')
 
         # Address
-        if self.config.get('address'):
+        if address:
             addr_row = info_row + 1
-            self.ws.row_dimensions[addr_row].height = 20
-            self.ws.merge_cells(f'A{addr_row}:E{addr_row}')
-            self.ws[f'A{addr_row}'] = f"📍 {self.config.get('address', '')}"
-            self.ws[f'A{addr_row}'].font = info_font
-            self.ws[f'A{addr_row}'].alignment = Alignment(horizontal='center', vertical='center')
+            self.sheet.set_row_height(addr_row, 20)
+            self.sheet.merge_cells(f'A{addr_row}:E{addr_row}')
+            cell = self.sheet.cell(addr_row, 1, address)
+            cell.font = info_font
+            cell.alignment = Alignment(horizontal='center', vertical='center')
 
             # Add a divider line
             divider_row = addr_row + 1
-            self.ws.row_dimensions[divider_row].height = 5
+            self.sheet.set_row_height(divider_row, 5)
             for col in range(1, 6):
-                self.ws.cell(row=divider_row, column=col).fill = PatternFill(
+                self.sheet.cell(divider_row, col).fill = PatternFill(
                     start_color="1F4788", end_color="1F4788", fill_type="solid"
                 )
             return divider_row + 2
 
         return info_row + 3
 
-    def add_product_section(self, products: List[Dict], section_title: str, start_row: int) -> int:
+    def get_product_name(self, product: Product) -> str:
+        handle = product.handle
+        if handle in self.product_names:
+            return self.product_names[handle]
+
+        languages = self.config.get('target_language', ['default'])
+        product_names = []
+
+        for lang in languages:
+            if lang == 'default':
+                product_names.append(product.title)
+            elif self.translation_extractor:
+                translated = self.translation_extractor.get_translated_title(handle, lang)
+                if translated:
+                    product_names.append(translated)
+
+        name = '\n'.join(product_names)
+        self.product_names[handle] = name
+        return name
+
+    def get_product_image_url(self, product: Product) -> str:
+        if product.images:
+            return product.images[0].src or ''
+        return ''
+
+    def get_image_data(self, image_url: str) -> Optional[Dict]:
+        # Memoized per URL so products repeated across tag sections share one encoding. One lookup,
+        # not a membership test and a read: the service prunes this dict while other jobs render
+        try:
+            return self.image_data[image_url]
+        except KeyError:
+            pass
+
+        img = self.image_fetcher.get_thumbnail(image_url)
+        image_data = self.encode_thumbnail(img) if img is not None else None
+        if image_data is None and self.config.get('image_placeholder', True):
+            # Images that failed to load get a shared placeholder instead of an empty cell
+            if self.placeholder_data is None:
+                self.placeholder_data = self.encode_thumbnail(placeholder_image())
+            image_data = self.placeholder_data
+            self.metrics.count('image_placeholders')
+
+        self.image_data[image_url] = image_data
+        return image_data
+
+    def encode_thumbnail(self, img: Image.Image) -> Optional[Dict]:
+        try:
+            data = encode_image(
+                img,
+                self.config.get('image_format', 'png'),
+                self.config.get('image_quality', 80),
+                self.config.get('image_png_optimize', False)
+            )
+            return {
+                'data': data,
+                'digest': hashlib.sha256(data).hexdigest(),
+                'format': self.config.get('image_format', 'png')
+            }
+        except Exception as e:
+            print(f"Error encoding image: {e}")
+            return None
+
+    def prefetch_images(self, grouped_products: Dict[str, List[Product]]):
+        urls = []
+        for products in grouped_products.values():
+            for product in products:
+                image_url = self.get_product_image_url(product)
+                if image_url:
+                    urls.append(image_url)
+
+        self.image_fetcher.prefetch(urls)
+
+    def get_failed_image_urls(self, grouped_products: Dict[str, List[Product]]) -> List[str]:
+        # Image URLs that did not load and so render as the placeholder or an empty cell
+        failed = []
+        for products in grouped_products.values():
+            for product in products:
+                image_url = self.get_product_image_url(product)
+                if image_url and self.image_fetcher.get_thumbnail(image_url) is None:
+                    failed.append(image_url)
+        return sorted(set(failed))
+
+    def add_product_section(self, products: List[Product], section_title: str, start_row: int) -> int:
         # Section title styling
         section_font = Font(size=16, bold=True, color="FFFFFF")
         header_font = Font(size=11, bold=True, color="FFFFFF")
@@ -161,15 +394,15 @@ class PriceBookGenerator:
         header_fill = PatternFill(start_color="4A6FA5", end_color="4A6FA5", fill_type="solid")
 
         # Section title
-        self.ws.row_dimensions[start_row].height = 30
-        self.ws.merge_cells(f'A{start_row}:E{start_row}')
-        self.ws[f'A{start_row}'] = f"  {section_title.upper()}  "
-        self.ws[f'A{start_row}'].font = section_font
-        self.ws[f'A{start_row}'].alignment = Alignment(horizontal='center', vertical='center')
-        self.ws[f'A{start_row}'].fill = section_fill
+        self.sheet.set_row_height(start_row, 30)
+        self.sheet.merge_cells(f'A{start_row}:E{start_row}')
+        cell = self.sheet.cell(start_row, 1, f"  {section_title.upper()}  ")
+        cell.font = section_font
+        cell.alignment = Alignment(horizontal='center', vertical='center')
+        cell.fill = section_fill
 
         for col in range(1, 6):
-            self.ws.cell(row=start_row, column=col).border = thin_border
+            self.sheet.cell(start_row, col).border = thin_border
 
         current_row = start_row + 1
 
@@ -177,10 +410,10 @@ class PriceBookGenerator:
             return current_row + 1
 
         # Column headers
-        self.ws.row_dimensions[current_row].height = 25
+        self.sheet.set_row_height(current_row, 25)
         headers = ['Image', 'SKU', 'Product Name', 'Variant', 'Wholesale Price']
         for col_idx, header in enumerate(headers, 1):
-            cell = self.ws.cell(row=current_row, column=col_idx, value=header)
+            cell = self.sheet.cell(current_row, col_idx, header)
             cell.font = header_font
             cell.alignment = Alignment(horizontal='center', vertical='center')
             cell.fill = header_fill
@@ -188,241 +421,175 @@ class PriceBookGenerator:
 
         current_row += 1
 
-        # Sort products by SKU (using first variant's SKU)
-        # Convert to string to handle mixed types (str, float, NaN)
-        sorted_products = sorted(products, key=lambda p: str(p.get('variants', [{}])[0].get('sku', '') or ''))
+        sorted_products = self.sort_products(products)
 
-        # Track row colors for alternating effect
-        row_count = 0
+        palette = self.get_style_palette()
 
         for product_idx, product in enumerate(sorted_products):
             # Store the starting row for this product
             product_start_row = current_row
 
             # Count variants to know how many rows to merge
-            variants = product.get('variants', [{}])
+            variants = product.variants
             variant_count = len(variants)
 
             # We'll add the image after merging cells
-            image_to_add = None
-            if product.get('images'):
-                image_url = product['images'][0].get('src', '')
-                if image_url:
-                    try:
-                        response = requests.get(image_url, timeout=10)
-                        if response.status_code == 200:
-                            img = Image.open(BytesIO(response.content))
-
-                            max_size = (100, 100)
-                            img.thumbnail(max_size, Image.Resampling.LANCZOS)
-
-                            # Create temp directory if it doesn't exist
-                            os.makedirs("temp", exist_ok=True)
+            image_url = self.get_product_image_url(product)
+            image_to_add = self.get_image_data(image_url) if image_url else None
 
-                            # Use unique filename with product handle to avoid conflicts
-                            temp_path = f"temp/temp_img_{product.get('handle', 'unknown')}_{product_start_row}.png"
-                            img.save(temp_path)
-                            self.temp_images.append(temp_path)  # Track temp files
-
-                            image_to_add = temp_path
+            # Get product name for merging across variants
+            product_name_combined = self.get_product_name(product)
 
-                            # Don't delete here - will cleanup after save
-                    except Exception as e:
-                        print(f"Error loading image: {e}")
+            # Merge image and name cells first so each cell below is styled exactly once
+            if variant_count > 1:
+                self.sheet.merge_cells(f'A{product_start_row}:A{product_start_row + variant_count - 1}')
+                self.sheet.merge_cells(f'C{product_start_row}:C{product_start_row + variant_count - 1}')
 
-            # Get product name for merging across variants
-            languages = self.config.get('target_language', ['default'])
-            product_names = []
-
-            for lang in languages:
-                if lang == 'default':
-                    product_names.append(product.get('title', ''))
-                elif self.translation_extractor:
-                    translated = self.translation_extractor.get_translated_title(
-                        product.get('handle', ''),
-                        lang
-                    )
-                    if translated:
-                        product_names.append(translated)
-
-            product_name_combined = '\n'.join(product_names)
+            # Alternating row color per product
+            parity = 'even' if product_idx % 2 == 0 else 'odd'
 
             for variant_idx, variant in enumerate(variants):
-                row_data = []
-
-                # Image column
-                row_data.append("")
-
-                # SKU
-                row_data.append(variant.get('sku', ''))
-
-                # Variant string
-                variant_parts = []
-                option1 = variant.get('option1', '')
-                if option1 and option1 != 'Default Title' and str(option1).lower() != 'nan':
-                    variant_parts.append(str(option1))
-                option2 = variant.get('option2', '')
-                if option2 and str(option2).lower() != 'nan':
-                    variant_parts.append(str(option2))
-                option3 = variant.get('option3', '')
-                if option3 and str(option3).lower() != 'nan':
-                    variant_parts.append(str(option3))
-
-                variant_str = ' / '.join(variant_parts) if variant_parts else ''
-
-                # Price
-                price = variant.get('price', 0)
-                try:
-                    price_val = float(price) if price else 0
-                    row_data.append(f"${price_val:.2f}")
-                except:
-                    row_data.append(str(price))
-
-                # Determine row color (alternating)
-                if product_idx % 2 == 0:
-                    row_fill = PatternFill(start_color="FFFFFF", end_color="FFFFFF", fill_type="solid")
-                else:
-                    row_fill = PatternFill(start_color="F8F9FA", end_color="F8F9FA", fill_type="solid")
-
-                # Define borders for product group
-                # Thicker border for product boundaries
-                thick_border = Border(
-                    left=Side(style='medium', color="4A6FA5"),
-                    right=Side(style='medium', color="4A6FA5"),
-                    top=Side(style='medium', color="4A6FA5") if variant_idx == 0 else Side(style='thin', color="E0E0E0"),
-                    bottom=Side(style='medium', color="4A6FA5") if variant_idx == variant_count - 1 else Side(style='thin', color="E0E0E0")
-                )
+                position = row_position(variant_idx, variant_count)
+
+                variant_str = self.get_variant_label(variant)
+                price_str = self.get_price_label(variant)
 
-                # Image column (A) - apply border
-                image_cell = self.ws.cell(row=current_row, column=1)
-                image_cell.border = thick_border
-                image_cell.fill = row_fill
+                # Image (A) and product name (C) cells, merged across variants
+                self.sheet.cell(current_row, 1).style = palette.product_style('image', position, parity)
+                self.sheet.cell(current_row, 3).style = palette.product_style('name', position, parity)
 
                 # SKU column (B)
-                sku_cell = self.ws.cell(row=current_row, column=2, value=row_data[1])
-                sku_cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-                sku_cell.border = thick_border
-                sku_cell.fill = row_fill
-                sku_cell.font = Font(color="2C3E50", size=14)
+                cell = self.sheet.cell(current_row, 2, variant.sku)
+                cell.style = palette.product_style('sku', position, parity)
 
                 # Variant column (D)
-                cell = self.ws.cell(row=current_row, column=4, value=variant_str)
-                cell.alignment = Alignment(horizontal='left', vertical='center', wrap_text=True)
-                cell.border = thick_border
-                cell.fill = row_fill
-                cell.font = Font(color="2C3E50", size=14)
+                cell = self.sheet.cell(current_row, 4, variant_str)
+                cell.style = palette.product_style('variant', position, parity)
 
                 # Price column (E)
-                cell = self.ws.cell(row=current_row, column=5, value=row_data[-1])
-                cell.alignment = Alignment(horizontal='right', vertical='center')
-                cell.border = thick_border
-                cell.fill = row_fill
-                cell.font = Font(color="2C3E50", size=14)
+                cell = self.sheet.cell(current_row, 5, price_str)
+                cell.style = palette.product_style('price', position, parity)
 
                 # Set row height based on variant count
                 if variant_count == 1:
                     # Single variant - standard height
-                    self.ws.row_dimensions[current_row].height = 85
+                    self.sheet.set_row_height(current_row, 85)
                 else:
                     # Multiple variants - calculate reduced height
                     # Total height should be around 100-120 for image display
                     # Distribute height across variants
                     if variant_idx == 0:
                         # First row gets slightly more height
-                        self.ws.row_dimensions[current_row].height = max(30, min(50, 100 / variant_count + 10))
+                        self.sheet.set_row_height(current_row, max(30, min(50, 100 / variant_count + 10)))
                     else:
                         # Other rows get proportional height
-                        self.ws.row_dimensions[current_row].height = max(25, min(40, 100 / variant_count))
+                        self.sheet.set_row_height(current_row, max(25, min(40, 100 / variant_count)))
 
                 current_row += 1
 
-            # After all variants, handle merged cells
-            if variant_count > 1:
-                # Merge cells for image
-                self.ws.merge_cells(f'A{product_start_row}:A{current_row - 1}')
-
-                # Set alignment for merged image cell
-                image_cell = self.ws[f'A{product_start_row}']
-                image_cell.alignment = Alignment(horizontal='center', vertical='center')
-
-                # Merge cells for product name
-                self.ws.merge_cells(f'C{product_start_row}:C{current_row - 1}')
-
-                # Apply borders to all cells in the merged ranges
-                for row_idx in range(product_start_row, current_row):
-                    # Image column borders
-                    image_cell = self.ws.cell(row=row_idx, column=1)
-                    image_cell.border = Border(
-                        left=Side(style='medium', color="4A6FA5"),
-                        right=Side(style='medium', color="4A6FA5"),
-                        top=Side(style='medium', color="4A6FA5") if row_idx == product_start_row else Side(style='thin', color="E0E0E0"),
-                        bottom=Side(style='medium', color="4A6FA5") if row_idx == current_row - 1 else Side(style='thin', color="E0E0E0")
-                    )
-                    image_cell.fill = row_fill
-
-                    # Product name column borders
-                    name_cell = self.ws.cell(row=row_idx, column=3)
-                    name_cell.border = Border(
-                        left=Side(style='medium', color="4A6FA5"),
-                        right=Side(style='medium', color="4A6FA5"),
-                        top=Side(style='medium', color="4A6FA5") if row_idx == product_start_row else Side(style='thin', color="E0E0E0"),
-                        bottom=Side(style='medium', color="4A6FA5") if row_idx == current_row - 1 else Side(style='thin', color="E0E0E0")
-                    )
-                    name_cell.fill = row_fill
-
-            # Add image to merged cell (or single cell) - AFTER merging is complete
+            # Add image to merged cell (or single cell)
             if image_to_add:
-                xl_img = XLImage(image_to_add)
-
                 # Set image size smaller to fit better
                 img_width = 100
                 img_height = 100
-                xl_img.width = img_width
-                xl_img.height = img_height
+
+                # The digest lets the workbook writer store identical images once
+                xl_img = BufferedImage(
+                    image_to_add['data'],
+                    image_to_add['format'],
+                    img_width,
+                    img_height,
+                    media_key=image_to_add['digest']
+                )
 
                 # Simply add the image to the first cell of the merged range
                 # Excel will handle it within the merged cell
-                self.ws.add_image(xl_img, f'A{product_start_row}')
+                self.sheet.add_image(xl_img, f'A{product_start_row}')
 
                 # For centering, we rely on the smaller size and let Excel handle the positioning
                 # The image will appear in the merged cell area
 
             # Write product name to the first cell (merged or not)
-            product_name_cell = self.ws[f'C{product_start_row}']
-            product_name_cell.value = product_name_combined
-            product_name_cell.alignment = Alignment(horizontal='left', vertical='center', wrap_text=True)
-            product_name_cell.font = Font(color="2C3E50", size=14)
-
-            # If only one variant, apply borders and alignment to single cells
-            if variant_count == 1:
-                # Image cell border and alignment
-                image_cell = self.ws[f'A{product_start_row}']
-                image_cell.alignment = Alignment(horizontal='center', vertical='center')
-                image_cell.border = Border(
-                    left=Side(style='medium', color="4A6FA5"),
-                    right=Side(style='medium', color="4A6FA5"),
-                    top=Side(style='medium', color="4A6FA5"),
-                    bottom=Side(style='medium', color="4A6FA5")
-                )
-                image_cell.fill = row_fill
-
-                # Product name cell border
-                product_name_cell.border = Border(
-                    left=Side(style='medium', color="4A6FA5"),
-                    right=Side(style='medium', color="4A6FA5"),
-                    top=Side(style='medium', color="4A6FA5"),
-                    bottom=Side(style='medium', color="4A6FA5")
-                )
-                product_name_cell.fill = row_fill
+            self.sheet.cell(product_start_row, 3, product_name_combined)
+
+            # Every row of this product is complete
+            self.sheet.flush(current_row)
 
             # Add spacing between different products
             if product_idx < len(products) - 1:
                 # Add an empty row for spacing
-                self.ws.row_dimensions[current_row].height = 10
+                self.sheet.set_row_height(current_row, 10)
                 current_row += 1
 
         return current_row + 2
 
+    def sort_products(self, products: List[Product]) -> List[Product]:
+        # Sort products by SKU (using first variant's SKU)
+        # Convert to string to handle mixed types (str, float, NaN)
+        return sorted(products, key=lambda p: str(p.variants[0].sku or '') if p.variants else '')
+
+    def get_variant_label(self, variant: Variant) -> str:
+        variant_parts = []
+        option1 = variant.option1
+        if option1 and option1 != 'Default Title' and str(option1).lower() != 'nan':
+            variant_parts.append(str(option1))
+        option2 = variant.option2
+        if option2 and str(option2).lower() != 'nan':
+            variant_parts.append(str(option2))
+        option3 = variant.option3
+        if option3 and str(option3).lower() != 'nan':
+            variant_parts.append(str(option3))
+
+        return ' / '.join(variant_parts) if variant_parts else ''
+
+    def get_price_label(self, variant: Variant) -> str:
+        price = variant.price
+        try:
+            price_val = float(price) if price else 0
+            return f"${price_val:.2f}"
+        except:
+            return str(price)
+
+    def get_logo_src(self) -> Optional[str]:
+        # The logo is small, so the HTML page carries it inline and stays a single file
+        logo_path = self.config.get('logo', '')
+        if not logo_path or not os.path.exists(logo_path):
+            return None
+        try:
+            logo_img = Image.open(logo_path)
+            logo_img.thumbnail((logo_img.width * 120 // logo_img.height, 120), Image.Resampling.LANCZOS)
+            return f"data:image/png;base64,{base64.b64encode(encode_image(logo_img)).decode()}"
+        except Exception as e:
+            print(f"Could not add logo: {e}")
+            return None
+
+    def render_html(self, grouped_products: Dict[str, List[Product]], output_file: str) -> str:
+        # Product images stay on the CDN; the page links the same rendition the fetcher would download
+        writer = HtmlCatalogWriter(output_file, self.config.get('company_name', 'Company Name'))
+        cdn_resize = self.config.get('image_cdn_resize', True)
+
+        print(f"Writing {output_file}...")
+        with self.metrics.stage('render'):
+            writer.open()
+            try:
+                writer.write_header(self.config.get('company_name', 'Company Name'),
+                                    list(self.get_contact_lines()), self.get_logo_src())
+                for tag, products in grouped_products.items():
+                    print(f"Adding section: {tag} with {len(products)} products")
+                    writer.start_section(tag)
+                    for product in self.sort_products(products):
+                        image_url = self.get_product_image_url(product)
+                        rows = [(str(variant.sku or ''), self.get_variant_label(variant),
+                                 self.get_price_label(variant)) for variant in product.variants]
+                        if image_url and cdn_resize:
+                            image_url = resized_image_url(image_url)
+                        writer.write_product(self.get_product_name(product), image_url or '', rows)
+                    writer.end_section()
+            finally:
+                writer.close()
+        self.metrics.add_counts(writer.stats())
+        return output_file
+
     def set_column_widths(self):
         column_widths = {
             'A': 15,   # Image
@@ -433,7 +600,7 @@ class PriceBookGenerator:
         }
 
         for col, width in column_widths.items():
-            self.ws.column_dimensions[col].width = width
+            self.sheet.set_column_width(col, width)
 
         # Add print settings for better output
         self.ws.print_options.horizontalCentered = True
@@ -441,35 +608,88 @@ class PriceBookGenerator:
         self.ws.page_setup.orientation = 'landscape'
         self.ws.page_setup.fitToWidth = 1
         self.ws.page_setup.fitToHeight = False
-        self.ws.page_setup.paperSize = self.ws.PAPERSIZE_LETTER
+        self.ws.page_setup.paperSize = Worksheet.PAPERSIZE_LETTER
 
-    def generate(self):
-        print("Initializing extractors...")
-        self.initialize_extractors()
+    def get_render_config(self) -> Dict:
+        # Config keys that change what a rendered section looks like
+        render_config = {key: self.config.get(key) for key in RENDER_CONFIG_KEYS}
+        logo_path = self.config.get('logo', '')
+        if logo_path and os.path.exists(logo_path):
+            render_config['logo_file'] = file_fingerprint(logo_path)
+        return render_config
+
+    def get_run_fingerprint(self) -> str:
+        input_files = self.get_input_files()
+        return fingerprint({
+            'config': self.get_render_config(),
+            'target_tag': self.config.get('target_tag', []),
+            'sharded_output': self.config.get('sharded_output', False),
+            'sections_per_shard': self.config.get('sections_per_shard', 1),
+            'output_format': self.config.get('output_format', 'xlsx'),
+            'offline_images': self.image_fetcher.offline,
+            'inputs': {
+                kind: [(os.path.basename(path), file_fingerprint(path)) for path in paths]
+                for kind, paths in input_files.items()
+            }
+        })
+
+    def get_product_fingerprint(self, product: Product) -> str:
+        variants = [
+            [variant.sku, variant.price, variant.option1, variant.option2, variant.option3]
+            for variant in product.variants
+        ]
+        return fingerprint({
+            'name': self.get_product_name(product),
+            'variants': variants,
+            'image': self.get_product_image_url(product)
+        })
+
+    def get_shard_fingerprint(self, shard: Dict[str, List[Product]]) -> str:
+        return fingerprint({
+            'config': self.get_render_config(),
+            'sections': [
+                [tag, [self.get_product_fingerprint(product) for product in products]]
+                for tag, products in shard.items()
+            ]
+        })
+
+    def get_grouped_products(self) -> Dict[str, List[Product]]:
+        # Filter by target_tag if specified
+        target_tags = self.config.get('target_tag', [])
+        if target_tags and isinstance(target_tags, list) and len(target_tags) > 0:
+            grouped_products = self.product_extractor.group_products_by_tag(target_tags)
+            if grouped_products:  # Only use filtered groups if we found matches
+                return grouped_products
+            print(f"Warning: No products found with tags: {target_tags}")
+
+        return self.product_extractor.group_products_by_tag()
 
+    def render_workbook(self, grouped_products: Dict[str, List[Product]], output_file: str) -> str:
+        with self.metrics.stage('render'):
+            self.build_workbook(grouped_products)
+
+        print(f"Saving to {output_file}...")
+        with self.metrics.stage('save'):
+            self.sheet.save(output_file)
+        self.metrics.add_counts(self.sheet.stats())
+
+        # Encoded thumbnails are in the saved workbook now
+        if not self.keep_warm:
+            self.image_data = {}
+
+        return output_file
+
+    def build_workbook(self, grouped_products: Dict[str, List[Product]]):
         print("Creating workbook...")
         self.create_workbook()
 
+        # Column layout goes first: a streaming sheet writes it before the first row
+        print("Setting column widths...")
+        self.set_column_widths()
+
         print("Adding header...")
         current_row = self.add_header()
 
-        print("Grouping products by tag...")
-        grouped_products = self.product_extractor.group_products_by_tag()
-
-        # Filter by target_tag if specified
-        target_tags = self.config.get('target_tag', [])
-        if target_tags and isinstance(target_tags, list) and len(target_tags) > 0:
-            filtered_groups = {}
-            for tag in target_tags:
-                if tag in grouped_products:
-                    filtered_groups[tag] = grouped_products[tag]
-            if filtered_groups:  # Only use filtered groups if we found matches
-                grouped_products = filtered_groups
-            else:
-                print(f"Warning: No products found with tags: {target_tags}")
-
-        print(f"Found {len(grouped_products)} product groups")
-
         for idx, (tag, products) in enumerate(grouped_products.items()):
             print(f"Adding section: {tag} with {len(products)} products")
             current_row = self.add_product_section(products, tag, current_row)
@@ -478,34 +698,241 @@ class PriceBookGenerator:
             if idx < len(grouped_products) - 1:
                 # Add a horizontal page break after this section
                 # The break occurs before the specified row, so we use current_row - 1
-                from openpyxl.worksheet.pagebreak import Break
-                self.ws.row_breaks.append(Break(id=current_row - 1))
-
-        print("Setting column widths...")
+                self.sheet.add_row_break(current_row - 1)
+
+    def get_shards(self, grouped_products: Dict[str, List[Product]]) -> List[Dict[str, List[Product]]]:
+        sections_per_shard = max(1, int(self.config.get('sections_per_shard', 1)))
+        sections = list(grouped_products.items())
+        return [
+            dict(sections[i:i + sections_per_shard])
+            for i in range(0, len(sections), sections_per_shard)
+        ]
+
+    def get_render_payload(self, grouped_products: Dict[str, List[Product]]) -> Tuple[Dict[str, str], Dict]:
+        # Workers get plain data: names and thumbnails are resolved here once,
+        # so render_shard needs neither the catalog nor the network
+        names = {}
+        thumbnails = {}
+        for products in grouped_products.values():
+            for product in products:
+                names[product.handle] = self.get_product_name(product)
+                image_url = self.get_product_image_url(product)
+                img = self.image_fetcher.get_thumbnail(image_url) if image_url else None
+                if img is not None:
+                    thumbnails[image_url] = img
+        return names, thumbnails
+
+    def render_shards(self, grouped_products: Dict[str, List[Product]], output_dir: str,
+                      previous_shards: Optional[Dict[str, str]] = None) -> Tuple[str, List[Dict]]:
+        os.makedirs(output_dir, exist_ok=True)
+        previous_shards = previous_shards or {}
+
+        shards = self.get_shards(grouped_products)
+        shard_records = []
+        jobs = []
+        job_records = []
+        for idx, shard in enumerate(shards, 1):
+            output_file = os.path.join(output_dir, f"{idx:02d}_{safe_filename(next(iter(shard)))}.xlsx")
+            shard_fingerprint = self.get_shard_fingerprint(shard)
+            record = {
+                'fingerprint': shard_fingerprint,
+                'file': output_file,
+                'sections': list(shard),
+                'failed_images': []
+            }
+            shard_records.append(record)
+
+            # Unchanged shards are copied from the last run instead of rendered
+            if shard_fingerprint in previous_shards:
+                previous_file = previous_shards[shard_fingerprint]
+                if os.path.abspath(previous_file) != os.path.abspath(output_file):
+                    shutil.copy2(previous_file, output_file)
+                continue
+
+            jobs.append((shard, output_file))
+            job_records.append(record)
+
+        print(f"Reusing {len(shards) - len(jobs)} unchanged shards")
+
+        self.metrics.count('shards_reused', len(shards) - len(jobs))
+        if jobs:
+            print("Prefetching images...")
+            with self.metrics.stage('fetch_images'):
+                self.prefetch_images({tag: products for shard, _ in jobs for tag, products in shard.items()})
+            # Shards with missing images are rendered again next time instead of reused
+            for (shard, _), record in zip(jobs, job_records):
+                record['failed_images'] = self.get_failed_image_urls(shard)
+
+            payloads = [(shard, *self.get_render_payload(shard), output_file) for shard, output_file in jobs]
+
+            processes = int(self.config.get('render_processes', 0) or os.cpu_count() or 1)
+            processes = max(1, min(processes, len(payloads)))
+            print(f"Rendering {len(payloads)} shards in {processes} processes...")
+            shard_reports = []
+            with self.metrics.stage('render_shards'):
+                if processes == 1:
+                    # A single shard or a single process is not worth starting a pool for
+                    reports = [render_shard(self.config, *payload) for payload in payloads]
+                else:
+                    with ProcessPoolExecutor(max_workers=processes) as executor:
+                        futures = [executor.submit(render_shard, self.config, *payload) for payload in payloads]
+                        reports = [future.result() for future in futures]
+                for (_, _, _, output_file), report in zip(payloads, reports):
+                    self.metrics.add_counts(report['counters'])
+                    shard_reports.append({'file': output_file, 'stages': report['stages']})
+            self.metrics.count('shards_rendered', len(payloads))
+            self.metrics.info['shards'] = shard_reports
+
+        index_file = os.path.join(output_dir, "index.xlsx")
+        print(f"Writing index to {index_file}...")
+        with self.metrics.stage('write_index'):
+            self.write_index(shards, [record['file'] for record in shard_records], index_file)
+        return index_file, shard_records
+
+    def write_index(self, shards: List[Dict[str, List[Product]]], shard_files: List[str], index_file: str):
+        self.create_workbook()
         self.set_column_widths()
+        current_row = self.add_header()
+
+        header_font = Font(size=11, bold=True, color="FFFFFF")
+        header_fill = PatternFill(start_color="4A6FA5", end_color="4A6FA5", fill_type="solid")
+        for col_idx, header in enumerate(['#', 'Products', 'Section', 'File'], 1):
+            cell = self.sheet.cell(current_row, col_idx, header)
+            cell.font = header_font
+            cell.alignment = Alignment(horizontal='center', vertical='center')
+            cell.fill = header_fill
+        current_row += 1
+
+        section_idx = 1
+        for shard, shard_file in zip(shards, shard_files):
+            file_name = os.path.basename(shard_file)
+            for tag, products in shard.items():
+                self.sheet.cell(current_row, 1, section_idx)
+                self.sheet.cell(current_row, 2, len(products))
+                self.sheet.cell(current_row, 3, tag)
+                link_cell = self.sheet.cell(current_row, 4, file_name)
+                link_cell.hyperlink = file_name
+                link_cell.font = Font(color="1F4788", underline="single")
+                current_row += 1
+                section_idx += 1
+
+        self.sheet.save(index_file)
+
+    def generate(self, offline: Optional[bool] = None):
+        if offline is not None:
+            self.image_fetcher.offline = offline
+        if self.image_fetcher.offline and not self.image_fetcher.cache:
+            print("Warning: offline image mode without a thumbnail cache, images will be skipped")
 
         os.makedirs("outputs", exist_ok=True)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_file = f"outputs/pricebook_{timestamp}.xlsx"
+        self.metrics.reset()
+
+        start_tracing = self.metrics.trace_memory and not tracemalloc.is_tracing()
+        if start_tracing:
+            tracemalloc.start()
+        try:
+            if self.config.get('profile', False):
+                profiler = cProfile.Profile()
+                output_file = profiler.runcall(self.run, timestamp)
+                self.save_profile(profiler, f"outputs/pricebook_{timestamp}_profile")
+            else:
+                output_file = self.run(timestamp)
+        finally:
+            if start_tracing:
+                tracemalloc.stop()
 
-        print(f"Saving to {output_file}...")
-        self.wb.save(output_file)
-        print(f"Price book generated successfully: {output_file}")
+        if self.config.get('run_report', True):
+            report_file = f"outputs/pricebook_{timestamp}_report.json"
+            self.metrics.info['output'] = output_file
+            self.metrics.write(report_file)
+            print(f"Run report written to {report_file}")
+
+        return output_file
 
-        # Cleanup temporary images after save
-        self.cleanup_temp_images()
+    def run(self, timestamp: str) -> str:
+        # Skip the run outright when no input or relevant setting changed since the last one
+        with self.metrics.stage('fingerprint'):
+            run_fingerprint = self.get_run_fingerprint()
+        if self.config.get('incremental', False):
+            previous_output = RunManifest("outputs/manifest.json").get_previous_output(run_fingerprint)
+            if previous_output:
+                print(f"No changes since the last run, price book is up to date: {previous_output}")
+                self.metrics.info['up_to_date'] = True
+                return previous_output
+
+        print("Initializing extractors...")
+        self.initialize_extractors()
+        # Names are memoized per run; a reused generator may have new products or translations
+        self.product_names = {}
+        # Images that got the placeholder last time are tried again
+        self.image_data = {url: data for url, data in self.image_data.items()
+                           if url in self.image_fetcher.thumbnails}
 
+        print("Grouping products by tag...")
+        with self.metrics.stage('group'):
+            grouped_products = self.get_grouped_products()
+        print(f"Found {len(grouped_products)} product groups")
+        self.metrics.count('sections', len(grouped_products))
+        self.metrics.count('section_products', sum(len(products) for products in grouped_products.values()))
+
+        manifest = RunManifest("outputs/manifest.json")
+        incremental = self.config.get('incremental', False)
+
+        if self.config.get('output_format', 'xlsx') == 'html':
+            # Images are linked, not embedded, so there is nothing to prefetch
+            output_file = self.render_html(grouped_products, f"outputs/pricebook_{timestamp}.html")
+            shard_records = []
+            failed_images = []
+        elif self.config.get('sharded_output', False):
+            # One workbook per group of sections, rendered in parallel, plus an index
+            output_file, shard_records = self.render_shards(
+                grouped_products,
+                f"outputs/pricebook_{timestamp}",
+                previous_shards=manifest.get_previous_shards() if incremental else None
+            )
+            failed_images = sorted({url for record in shard_records for url in record['failed_images']})
+        else:
+            print("Prefetching images...")
+            with self.metrics.stage('fetch_images'):
+                self.prefetch_images(grouped_products)
+            output_file = self.render_workbook(grouped_products, f"outputs/pricebook_{timestamp}.xlsx")
+            shard_records = []
+            failed_images = self.get_failed_image_urls(grouped_products)
+
+        if failed_images:
+            print(f"{len(failed_images)} images could not be loaded; the next incremental run will retry them")
+        manifest.save(run_fingerprint, output_file, shard_records, failed_images)
+        print(f"Price book generated successfully: {output_file}")
         return output_file
 
-    def cleanup_temp_images(self):
-        """Remove temporary image files after workbook is saved"""
-        for temp_path in self.temp_images:
-            try:
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
-            except Exception as e:
-                print(f"Warning: Could not remove temp file {temp_path}: {e}")
-        self.temp_images = []
+    def save_profile(self, profiler: cProfile.Profile, path: str):
+        # Raw stats for snakeviz/pstats plus a readable top list by cumulative time
+        profiler.dump_stats(f"{path}.prof")
+        with open(f"{path}.txt", 'w', encoding='utf-8') as f:
+            stats = pstats.Stats(profiler, stream=f)
+            stats.sort_stats('cumulative').print_stats(40)
+        print(f"Profile written to {path}.prof")
+
+def natural_sort_key(path: str) -> List:
+    return [int(part) if part.isdigit() else part.lower() for part in re.split(r'(\d+)', path)]
+
+def safe_filename(name: str) -> str:
+    return re.sub(r'[^\w\-]+', '_', name).strip('_') or 'section'
+
+def render_shard(config: Dict, sections: Dict[str, List[Product]], product_names: Dict[str, str],
+                 thumbnails: Dict, output_file: str) -> Dict:
+    # Runs in a worker process (or in-process) with everything it needs passed in; the fetcher
+    # only holds the thumbnails, with no disk cache to load and nothing to download
+    image_fetcher = ImageFetcher(cache=None)
+    image_fetcher.thumbnails = thumbnails
+    try:
+        generator = PriceBookGenerator(config=config, image_fetcher=image_fetcher)
+        generator.product_names = product_names
+        generator.render_workbook(sections, output_file)
+    finally:
+        image_fetcher.close()
+    return generator.metrics.to_dict()
 
 def main():
     generator = PriceBookGenerator()
@@ -0,0 +1,172 @@
+import json
+import os
+import sqlite3
+from typing import Dict, List, Optional
+from lib.run_manifest import fingerprint, file_fingerprint
+from lib.product_model import Product, normalize_tag
+
+# Bump when the tables change meaning; older stores are dropped and rebuilt from the CSVs
+STORE_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    kind TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    sha256 TEXT NOT NULL,
+    options TEXT NOT NULL,
+    PRIMARY KEY (kind, path)
+);
+CREATE TABLE IF NOT EXISTS products (
+    handle TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS product_tags (
+    tag TEXT NOT NULL,
+    handle TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_product_tags_tag ON product_tags (tag);
+CREATE TABLE IF NOT EXISTS translations (
+    item_type TEXT,
+    item_id TEXT,
+    locale TEXT,
+    field TEXT,
+    default_content TEXT,
+    translated_content TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_translations_item ON translations (item_type, item_id, locale);
+CREATE INDEX IF NOT EXISTS idx_translations_content ON translations (item_type, field, locale, default_content);
+"""
+
+class CatalogStore:
+    """SQLite copy of the parsed product and translation models, keyed by their source CSVs"""
+
+    def __init__(self, path: str = "cache/catalog.sqlite"):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != STORE_VERSION:
+            self.drop_tables()
+        self.conn.executescript(SCHEMA)
+        self.conn.execute(f"PRAGMA user_version = {STORE_VERSION}")
+
+    def drop_tables(self):
+        with self.conn:
+            for table in ('sources', 'products', 'product_tags', 'translations'):
+                self.conn.execute(f"DROP TABLE IF EXISTS {table}")
+
+    def is_current(self, kind: str, paths: List[str], options: Optional[Dict] = None) -> bool:
+        rows = self.conn.execute(
+            "SELECT path, size, mtime, sha256, options FROM sources WHERE kind = ?", (kind,)
+        ).fetchall()
+        stored = {row[0]: row[1:] for row in rows}
+        if set(stored) != {os.path.abspath(path) for path in paths}:
+            return False
+
+        options_key = fingerprint(options or {})
+        for path in paths:
+            size, mtime, sha256, stored_options = stored[os.path.abspath(path)]
+            if stored_options != options_key:
+                return False
+
+            stat = os.stat(path)
+            if stat.st_size == size and stat.st_mtime == mtime:
+                continue
+
+            # Touched but not modified (e.g. copied again): keep the store, remember the new mtime
+            if stat.st_size == size and file_fingerprint(path) == sha256:
+                with self.conn:
+                    self.conn.execute(
+                        "UPDATE sources SET mtime = ? WHERE kind = ? AND path = ?",
+                        (stat.st_mtime, kind, os.path.abspath(path))
+                    )
+                continue
+
+            return False
+        return True
+
+    def _record_sources(self, kind: str, paths: List[str], options: Optional[Dict] = None):
+        options_key = fingerprint(options or {})
+        self.conn.execute("DELETE FROM sources WHERE kind = ?", (kind,))
+        for path in paths:
+            stat = os.stat(path)
+            self.conn.execute(
+                "INSERT INTO sources (kind, path, size, mtime, sha256, options) VALUES (?, ?, ?, ?, ?, ?)",
+                (kind, os.path.abspath(path), stat.st_size, stat.st_mtime, file_fingerprint(path), options_key)
+            )
+
+    def save_products(self, paths: List[str], products: Dict[str, Product]):
+        with self.conn:
+            self.conn.execute("DELETE FROM products")
+            self.conn.execute("DELETE FROM product_tags")
+            self.conn.executemany(
+                "INSERT INTO products (handle, position, data) VALUES (?, ?, ?)",
+                ((handle, position, json.dumps(product.to_dict(), default=str))
+                 for position, (handle, product) in enumerate(products.items()))
+            )
+            self.conn.executemany(
+                "INSERT INTO product_tags (tag, handle) VALUES (?, ?)",
+                ((tag, handle) for handle, product in products.items()
+                 for tag in dict.fromkeys(normalize_tag(tag) for tag in product.tags))
+            )
+            self._record_sources('products', paths)
+
+    def load_products(self) -> Dict[str, Product]:
+        rows = self.conn.execute("SELECT handle, data FROM products ORDER BY position")
+        return {handle: Product.from_dict(json.loads(data)) for handle, data in rows}
+
+    def get_product(self, handle: str) -> Optional[Product]:
+        row = self.conn.execute("SELECT data FROM products WHERE handle = ?", (handle,)).fetchone()
+        return Product.from_dict(json.loads(row[0])) if row else None
+
+    def get_products_by_tag(self, tag: str) -> List[Product]:
+        rows = self.conn.execute(
+            "SELECT p.data FROM product_tags t JOIN products p ON p.handle = t.handle "
+            "WHERE t.tag = ? ORDER BY p.position",
+            (normalize_tag(tag),)
+        )
+        return [Product.from_dict(json.loads(data)) for data, in rows]
+
+    def get_all_tags(self) -> set:
+        # Normalized spellings, as indexed
+        return {tag for tag, in self.conn.execute("SELECT DISTINCT tag FROM product_tags")}
+
+    def save_translations(self, paths: List[str], translations: Dict, options: Optional[Dict] = None):
+        with self.conn:
+            self.conn.execute("DELETE FROM translations")
+            self.conn.executemany(
+                "INSERT INTO translations VALUES (?, ?, ?, ?, ?, ?)",
+                ((item_type, item_id, locale, field, content.get('default'), content.get('translated'))
+                 for item_type, items in translations.items()
+                 for item_id, locales in items.items()
+                 for locale, fields in locales.items()
+                 for field, content in fields.items())
+            )
+            self._record_sources('translations', paths, options)
+
+    def load_translations(self) -> Dict:
+        translations = {}
+        rows = self.conn.execute("SELECT * FROM translations ORDER BY rowid")
+        for item_type, item_id, locale, field, default_content, translated_content in rows:
+            item = translations.setdefault(item_type, {}).setdefault(item_id, {})
+            item.setdefault(locale, {})[field] = {
+                'default': default_content,
+                'translated': translated_content
+            }
+        return translations
+
+    def get_translated_title(self, product_handle: str, locale: str) -> Optional[str]:
+        row = self.conn.execute(
+            "SELECT t.translated_content FROM translations h "
+            "JOIN translations t ON t.item_type = h.item_type AND t.item_id = h.item_id "
+            "AND t.locale = h.locale AND t.field = 'title' "
+            "WHERE h.item_type = 'PRODUCT' AND h.field = 'handle' AND h.locale = ? AND h.default_content = ? "
+            "ORDER BY h.rowid LIMIT 1",
+            (locale, product_handle)
+        ).fetchone()
+        return row[0] if row else None
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,18 @@
+import os
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Optional
+
+def read_csv_files(read_file: Callable[[str], pd.DataFrame], paths: List[str],
+                   max_workers: Optional[int] = None) -> pd.DataFrame:
+    """Parse each file with `read_file` in its own process and stack the rows in file order"""
+    if len(paths) == 1:
+        return read_file(paths[0])
+
+    workers = max(1, min(max_workers or os.cpu_count() or 1, len(paths)))
+    if workers == 1:
+        frames = [read_file(path) for path in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            frames = list(executor.map(read_file, paths))
+    return pd.concat(frames, ignore_index=True)
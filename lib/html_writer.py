@@ -0,0 +1,98 @@
+import os
+from html import escape
+from typing import List, Optional, Tuple
+
+# Same palette as the workbook: header, section title, column headers, alternating rows
+HTML_STYLE = """
+body { font-family: -apple-system, "Segoe UI", Helvetica, Arial, sans-serif; color: #2C3E50; margin: 24px; }
+header { background: #F0F4F8; text-align: center; padding: 12px; border-bottom: 5px solid #1F4788; }
+header img { height: 60px; vertical-align: middle; margin-right: 16px; }
+header h1 { display: inline-block; color: #1F4788; font-size: 32px; margin: 0; vertical-align: middle; }
+header p { color: #4A4A4A; margin: 6px 0 0; }
+section { margin-top: 32px; break-before: page; }
+section:first-of-type { break-before: auto; }
+h2 { background: #2E5090; color: #FFFFFF; text-align: center; text-transform: uppercase; padding: 8px; margin: 0; }
+table { border-collapse: collapse; width: 100%; }
+th { background: #4A6FA5; color: #FFFFFF; padding: 6px; }
+td { padding: 6px 8px; border: 1px solid #E0E0E0; }
+tbody { border: 2px solid #4A6FA5; }
+tbody:nth-of-type(even) td { background: #F8F9FA; }
+td.image { width: 110px; text-align: center; }
+td.image img { width: 100px; height: 100px; object-fit: contain; }
+td.sku { text-align: center; }
+td.price { text-align: right; white-space: nowrap; }
+"""
+
+class HtmlCatalogWriter:
+    """Writes the price book as one HTML page, section by section, straight to the file.
+
+    Product images are linked by URL and loaded by the browser, so nothing is
+    downloaded or embedded while the page is written.
+    """
+
+    def __init__(self, filename: str, title: str = "Price List"):
+        self.filename = filename
+        self.title = title
+        self.file = None
+        self.sections_written = 0
+        self.products_written = 0
+        self.rows_written = 0
+
+    def open(self):
+        os.makedirs(os.path.dirname(self.filename) or '.', exist_ok=True)
+        self.file = open(self.filename, 'w', encoding='utf-8')
+        self.file.write(
+            f'<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n'
+            f'<meta name="viewport" content="width=device-width, initial-scale=1">\n'
+            f'<title>{escape(self.title)}</title>\n<style>{HTML_STYLE}</style>\n</head>\n<body>\n'
+        )
+
+    def write_header(self, company_name: str, contact_lines: List[str], logo_src: Optional[str] = None):
+        logo = f'<img src="{escape(logo_src)}" alt="">' if logo_src else ''
+        lines = ''.join(f'<p>{escape(line)}</p>' for line in contact_lines if line)
+        self.file.write(f'<header>{logo}<h1>{escape(company_name)}</h1>{lines}</header>\n')
+
+    def start_section(self, title: str):
+        self.file.write(
+            f'<section>\n<h2>{escape(title)}</h2>\n<table>\n'
+            f'<thead><tr><th>Image</th><th>SKU</th><th>Product Name</th><th>Variant</th>'
+            f'<th>Wholesale Price</th></tr></thead>\n'
+        )
+        self.sections_written += 1
+
+    def write_product(self, name: str, image_src: str, rows: List[Tuple[str, str, str]]):
+        # rows: (SKU, variant, price) per variant; image and name span all of them like the merged cells
+        span = max(1, len(rows))
+        image = f'<img src="{escape(image_src)}" alt="" loading="lazy">' if image_src else ''
+        name_html = '<br>'.join(escape(line) for line in name.split('\n'))
+
+        lines = ['<tbody>']
+        for idx, (sku, variant, price) in enumerate(rows or [('', '', '')]):
+            lines.append('<tr>')
+            if idx == 0:
+                lines.append(f'<td class="image" rowspan="{span}">{image}</td>')
+            lines.append(f'<td class="sku">{escape(sku)}</td>')
+            if idx == 0:
+                lines.append(f'<td class="name" rowspan="{span}">{name_html}</td>')
+            lines.append(f'<td class="variant">{escape(variant)}</td><td class="price">{escape(price)}</td></tr>')
+        lines.append('</tbody>\n')
+        self.file.write(''.join(lines))
+
+        self.products_written += 1
+        self.rows_written += span
+
+    def end_section(self):
+        self.file.write('</table>\n</section>\n')
+
+    def close(self):
+        if self.file:
+            self.file.write('</body>\n</html>\n')
+            self.file.close()
+            self.file = None
+
+    def stats(self) -> dict:
+        return {
+            'sections_written': self.sections_written,
+            'products_written': self.products_written,
+            'rows_written': self.rows_written,
+        }
@@ -0,0 +1,123 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from io import BytesIO
+from PIL import Image
+from typing import Dict, Optional
+
+class ThumbnailCache:
+    def __init__(self, cache_dir: str = "cache/thumbnails", max_size_mb: float = 200):
+        self.cache_dir = cache_dir
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self.entries = {}
+        self._lock = threading.Lock()
+        self.load_index()
+
+    def load_index(self):
+        if not os.path.exists(self.index_path):
+            return
+
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except Exception as e:
+            print(f"Could not read thumbnail cache index: {e}")
+            self.entries = {}
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}.png")
+
+    def get_entry(self, url: str) -> Optional[Dict]:
+        entry = self.entries.get(url)
+        if entry and os.path.exists(self._blob_path(entry['digest'])):
+            return entry
+        return None
+
+    def load(self, url: str) -> Optional[Image.Image]:
+        entry = self.get_entry(url)
+        if not entry:
+            return None
+
+        try:
+            with open(self._blob_path(entry['digest']), 'rb') as f:
+                img = Image.open(BytesIO(f.read()))
+                img.load()
+        except Exception as e:
+            print(f"Could not read cached thumbnail for {url}: {e}")
+            return None
+
+        self.touch(url)
+        return img
+
+    def touch(self, url: str):
+        with self._lock:
+            if url in self.entries:
+                self.entries[url]['last_used'] = time.time()
+
+    def store(self, url: str, img: Image.Image, etag: Optional[str] = None,
+              last_modified: Optional[str] = None):
+        buffer = BytesIO()
+        img.save(buffer, format='PNG')
+        data = buffer.getvalue()
+
+        # Blobs are addressed by their content so identical thumbnails share one file
+        digest = hashlib.sha256(data).hexdigest()
+        blob_path = self._blob_path(digest)
+        if not os.path.exists(blob_path):
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            temp_path = f"{blob_path}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, blob_path)
+
+        with self._lock:
+            self.entries[url] = {
+                'digest': digest,
+                'size': len(data),
+                'etag': etag,
+                'last_modified': last_modified,
+                'last_used': time.time()
+            }
+
+    def total_size(self) -> int:
+        sizes = {}
+        for entry in self.entries.values():
+            sizes[entry['digest']] = entry['size']
+        return sum(sizes.values())
+
+    def evict(self):
+        # Drop least recently used URLs until the unique blobs fit within max_bytes
+        with self._lock:
+            total = self.total_size()
+            if total <= self.max_bytes:
+                return
+
+            refcounts = {}
+            for entry in self.entries.values():
+                refcounts[entry['digest']] = refcounts.get(entry['digest'], 0) + 1
+
+            for url, entry in sorted(self.entries.items(), key=lambda item: item[1].get('last_used', 0)):
+                if total <= self.max_bytes:
+                    break
+
+                del self.entries[url]
+                digest = entry['digest']
+                refcounts[digest] -= 1
+                if refcounts[digest] == 0:
+                    total -= entry['size']
+                    try:
+                        os.remove(self._blob_path(digest))
+                    except OSError:
+                        pass
+
+    def save(self):
+        self.evict()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with self._lock:
+            temp_path = f"{self.index_path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f)
+            os.replace(temp_path, self.index_path)
@@ -0,0 +1,320 @@
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from io import BytesIO
+from urllib.parse import parse_qsl, urlencode, urlparse
+from PIL import Image, ImageDraw
+from typing import Dict, Iterable, Optional, Tuple
+from lib.image_cache import ThumbnailCache
+from lib.run_metrics import RunMetrics
+
+THUMBNAIL_SIZE = (100, 100)
+
+# Rendition asked from the CDN; twice the thumbnail so the local LANCZOS pass still has detail
+CDN_RENDITION_SIZE = (200, 200)
+
+# Responses worth another attempt; anything else (404, 403, ...) will not get better
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+class TransientFetchError(Exception):
+    pass
+
+def resized_image_url(url: str, size=CDN_RENDITION_SIZE) -> str:
+    # Shopify's CDN scales to fit within width x height when both are given; other params (v=) are kept
+    parts = urlparse(url)
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+             if key not in ('width', 'height')]
+    query += [('width', str(size[0])), ('height', str(size[1]))]
+    return parts._replace(query=urlencode(query)).geturl()
+
+def decode_thumbnail(data: bytes, size=THUMBNAIL_SIZE) -> Image.Image:
+    img = Image.open(BytesIO(data))
+    # JPEGs decode straight at the smallest 1/2, 1/4 or 1/8 scale that is still twice the thumbnail,
+    # so full-resolution pixels are never built; other formats ignore the draft
+    img.draft('RGB', (size[0] * 2, size[1] * 2))
+    img.thumbnail(size, Image.Resampling.LANCZOS)
+    if img.mode == 'CMYK':
+        img = img.convert('RGB')
+    return img
+
+def placeholder_image(size=THUMBNAIL_SIZE) -> Image.Image:
+    # Stands in for product photos that could not be loaded
+    img = Image.new('RGB', size, (240, 242, 245))
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([0, 0, size[0] - 1, size[1] - 1], outline=(200, 205, 212))
+    text = "No image"
+    left, top, right, bottom = draw.textbbox((0, 0), text)
+    draw.text(((size[0] - (right - left)) / 2, (size[1] - (bottom - top)) / 2), text, fill=(140, 148, 160))
+    return img
+
+def encode_image(img: Image.Image, image_format: str = 'png', quality: int = 80,
+                 png_optimize: bool = False) -> bytes:
+    buffer = BytesIO()
+    if image_format.lower() in ('jpeg', 'jpg'):
+        # JPEG has no alpha channel, flatten transparent images onto white
+        if img.mode in ('RGBA', 'LA', 'P'):
+            rgba = img.convert('RGBA')
+            img = Image.new('RGB', rgba.size, (255, 255, 255))
+            img.paste(rgba, mask=rgba.getchannel('A'))
+        elif img.mode != 'RGB':
+            img = img.convert('RGB')
+        img.save(buffer, format='JPEG', quality=quality, optimize=True)
+    else:
+        # optimize=True makes thumbnails about 9% smaller but takes about 5x longer to encode
+        img.save(buffer, format='PNG', optimize=png_optimize)
+    return buffer.getvalue()
+
+class CircuitBreaker:
+    """Stops requests to a host after `threshold` failures in a row.
+
+    Callers are turned away, not queued, while the breaker is open. After
+    `cooldown` seconds one trial request is let through; success closes the
+    breaker again, another failure keeps it open for a new cooldown.
+    """
+
+    def __init__(self, threshold: int = 5, cooldown: float = 30):
+        self.threshold = max(1, int(threshold))
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.cooldown:
+                # Half-open: this caller gets the trial; the others are still refused until it succeeds
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+class ImageFetcher:
+    def __init__(self, max_workers: int = 8, timeout: float = 10,
+                 cache: Optional[ThumbnailCache] = None, offline: bool = False,
+                 metrics: Optional[RunMetrics] = None, retries: int = 2, backoff: float = 0.5,
+                 host_connections: int = 8, failure_threshold: int = 5, breaker_cooldown: float = 30,
+                 time_budget: float = 0, cdn_resize: bool = False, decode_processes: int = 1):
+        self.max_workers = max(1, int(max_workers))
+        self.timeout = timeout
+        self.cache = cache
+        self.offline = offline
+        self.metrics = metrics
+        self.cdn_resize = cdn_resize
+        self.decode_processes = max(1, int(decode_processes or 1))
+        self.decoder = None  # Process pool decoding downloads during prefetch
+        self.thumbnails = {}
+
+        self.retries = max(0, int(retries))
+        self.backoff = backoff
+        self.host_connections = max(1, int(host_connections))
+        self.failure_threshold = failure_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.time_budget = time_budget  # Seconds for all image work of one prefetch, 0 = no limit
+        self.deadline = None
+        self.host_slots = {}  # host -> semaphore limiting concurrent requests
+        self.breakers = {}  # host -> CircuitBreaker
+        self.hosts_lock = threading.Lock()
+
+        # One pooled session shared by all workers so connections to the CDN are reused
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def count(self, name: str, amount: int = 1):
+        if self.metrics:
+            self.metrics.count(name, amount)
+
+    def remaining_time(self) -> Optional[float]:
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
+
+    def request_timeout(self) -> float:
+        remaining = self.remaining_time()
+        return self.timeout if remaining is None else max(0.1, min(self.timeout, remaining))
+
+    def get_breaker(self, host: str) -> CircuitBreaker:
+        with self.hosts_lock:
+            breaker = self.breakers.get(host)
+            if breaker is None:
+                breaker = self.breakers[host] = CircuitBreaker(self.failure_threshold, self.breaker_cooldown)
+            return breaker
+
+    @contextmanager
+    def host_slot(self, host: str):
+        with self.hosts_lock:
+            slot = self.host_slots.get(host)
+            if slot is None:
+                slot = self.host_slots[host] = threading.BoundedSemaphore(self.host_connections)
+        with slot:
+            yield
+
+    def get(self, url: str, headers: Optional[Dict] = None) -> requests.Response:
+        response = self.session.get(url, headers=headers, timeout=self.request_timeout())
+        if response.status_code in RETRYABLE_STATUS:
+            raise TransientFetchError(f"HTTP {response.status_code} for {url}")
+        return response
+
+    def download(self, url: str, headers: Optional[Dict] = None) -> Tuple[requests.Response, bool]:
+        # With cdn_resize the small rendition is tried first and the original is the fallback;
+        # returns the response and whether it is the rendition
+        if self.cdn_resize:
+            response = self.get(resized_image_url(url), headers=headers)
+            if response.status_code in (200, 304):
+                return response, True
+            self.count('images_resize_fallback')
+        return self.get(url, headers=headers), False
+
+    def fetch_thumbnail(self, url: str) -> Optional[Image.Image]:
+        entry = self.cache.get_entry(url) if self.cache else None
+        if self.offline:
+            img = self.cache.load(url) if entry else None
+            if img is not None:
+                self.count('images_cached')
+            return img
+
+        # Revalidate cached thumbnails with a conditional request
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        response, resized = self.download(url, headers=headers)
+        if response.status_code == 304 and entry:
+            img = self.cache.load(url)
+            if img is not None:
+                self.count('images_cached')
+                return img
+            response, resized = self.download(url)
+
+        if response.status_code != 200:
+            return None
+
+        self.count('images_downloaded')
+        self.count('bytes_downloaded', len(response.content))
+
+        try:
+            img = self.decode(response.content)
+        except Exception:
+            if not resized:
+                raise
+            # The rendition came back but is not a usable image; try the original once
+            self.count('images_resize_fallback')
+            response = self.get(url)
+            if response.status_code != 200:
+                return None
+            self.count('bytes_downloaded', len(response.content))
+            img = self.decode(response.content)
+
+        if self.cache:
+            self.cache.store(
+                url, img,
+                etag=response.headers.get('ETag'),
+                last_modified=response.headers.get('Last-Modified')
+            )
+        return img
+
+    def decode(self, data: bytes) -> Image.Image:
+        # Download threads hand the CPU-bound decode to the pool and wait for the thumbnail
+        if self.decoder:
+            return self.decoder.submit(decode_thumbnail, data).result()
+        return decode_thumbnail(data)
+
+    def _fetch_safe(self, url: str) -> Optional[Image.Image]:
+        if self.offline:
+            try:
+                return self.fetch_thumbnail(url)
+            except Exception as e:
+                print(f"Error loading image: {e}")
+                return None
+
+        host = urlparse(url).netloc
+        breaker = self.get_breaker(host)
+        for attempt in range(self.retries + 1):
+            remaining = self.remaining_time()
+            if remaining is not None and remaining <= 0:
+                self.count('images_skipped_time_budget')
+                return None
+            if not breaker.allow():
+                # Dropped at once rather than held for the trial, so a dead host fails fast
+                self.count('images_skipped_circuit_open')
+                return None
+
+            try:
+                with self.host_slot(host):
+                    img = self.fetch_thumbnail(url)
+                breaker.record_success()
+                return img
+            except (TransientFetchError, requests.ConnectionError, requests.Timeout) as e:
+                breaker.record_failure()
+                if attempt == self.retries:
+                    print(f"Error loading image after {attempt + 1} attempts: {e}")
+                    return None
+
+                # Exponential backoff with jitter, never sleeping past the time budget
+                delay = self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+                remaining = self.remaining_time()
+                if remaining is not None:
+                    delay = min(delay, max(0, remaining))
+                self.count('image_retries')
+                time.sleep(delay)
+            except Exception as e:
+                # Undecodable or otherwise broken images are not retried
+                print(f"Error loading image: {e}")
+                return None
+        return None
+
+    def prefetch(self, urls: Iterable[str]) -> Dict[str, Image.Image]:
+        pending = [url for url in dict.fromkeys(urls) if url and url not in self.thumbnails]
+        if not pending:
+            return self.thumbnails
+
+        self.count('images_requested', len(pending))
+        self.deadline = time.monotonic() + self.time_budget if self.time_budget else None
+        if self.decode_processes > 1 and not self.offline:
+            self.decoder = ProcessPoolExecutor(max_workers=self.decode_processes)
+            # Fork the workers now, before this prefetch starts its download threads; callers
+            # that already run threads of their own should use decode_processes=1
+            self.decoder.submit(int).result()
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for url, img in zip(pending, executor.map(self._fetch_safe, pending)):
+                    if img is not None:
+                        self.thumbnails[url] = img
+                    else:
+                        self.count('images_failed')
+        finally:
+            self.deadline = None
+            if self.decoder:
+                self.decoder.shutdown()
+                self.decoder = None
+
+        if self.cache:
+            self.cache.save()
+
+        return self.thumbnails
+
+    def get_thumbnail(self, url: str) -> Optional[Image.Image]:
+        return self.thumbnails.get(url)
+
+    def close(self):
+        self.session.close()
@@ -1,124 +1,240 @@
 import pandas as pd
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any, Union
 import os
+from lib.csv_loader import read_csv_files
+from lib.product_model import Product, Variant, ProductImage, intern_value, parse_tags, normalize_tag
+
+# Model field -> (CSV column, default when the column is missing)
+PRODUCT_COLUMNS = {
+    'title': ('Title', ''),
+    'body_html': ('Body (HTML)', ''),
+    'vendor': ('Vendor', ''),
+    'product_category': ('Product Category', ''),
+    'type': ('Type', ''),
+    'tags': ('Tags', ''),
+    'published': ('Published', True),
+    'status': ('Status', 'active'),
+}
+
+VARIANT_COLUMNS = {
+    'sku': ('Variant SKU', ''),
+    'price': ('Variant Price', 0),
+    'compare_at_price': ('Variant Compare At Price', ''),
+    'inventory_qty': ('Variant Inventory Qty', 0),
+    'weight': ('Variant Grams', 0),
+    'weight_unit': ('Variant Weight Unit', 'g'),
+    'barcode': ('Variant Barcode', ''),
+    'option1': ('Option1 Value', ''),
+    'option2': ('Option2 Value', ''),
+    'option3': ('Option3 Value', ''),
+    'option1_name': ('Option1 Name', ''),
+    'option2_name': ('Option2 Name', ''),
+    'option3_name': ('Option3 Name', ''),
+    'taxable': ('Variant Taxable', True),
+    'requires_shipping': ('Variant Requires Shipping', True),
+}
+
+IMAGE_COLUMNS = {
+    'src': ('Image Src', None),
+    'position': ('Image Position', 1),
+    'alt_text': ('Image Alt Text', ''),
+}
+
+# Only these columns are read; the export's metafield, SEO and Google Shopping columns are skipped
+USED_COLUMNS = {'Handle'} | {
+    column for fields in (PRODUCT_COLUMNS, VARIANT_COLUMNS, IMAGE_COLUMNS)
+    for column, _ in fields.values()
+}
+
+# Low-cardinality fields whose strings are interned so equal values share one object
+INTERNED_FIELDS = {
+    'vendor', 'product_category', 'type', 'status', 'weight_unit',
+    'option1', 'option2', 'option3', 'option1_name', 'option2_name', 'option3_name',
+}
+
+def _records(df: pd.DataFrame, fields: Dict[str, tuple], record_type) -> List[Any]:
+    # Column-wise tolist() + zip is several times faster than DataFrame.to_dict('records')
+    columns = []
+    for field, (column, _) in fields.items():
+        values = df[column].tolist()
+        if field == 'tags':
+            values = [parse_tags(value) for value in values]
+        elif field in INTERNED_FIELDS:
+            values = [intern_value(value) for value in values]
+        columns.append(values)
+    return [record_type(*values) for values in zip(*columns)]
+
+# Free-text columns are always read as strings, so an all-numeric run of SKUs or option
+# values in one file or chunk doesn't turn into floats while the rest stay text
+TEXT_COLUMNS = {'Handle'} | {
+    fields[field][0]
+    for fields, names in (
+        (PRODUCT_COLUMNS, ('title', 'body_html', 'vendor', 'product_category', 'type', 'tags', 'status')),
+        (VARIANT_COLUMNS, ('sku', 'barcode', 'weight_unit', 'option1', 'option2', 'option3',
+                           'option1_name', 'option2_name', 'option3_name')),
+        (IMAGE_COLUMNS, ('src', 'alt_text')),
+    )
+    for field in names
+}
+
+def read_product_csv(path: str, chunksize: Optional[int] = None):
+    return pd.read_csv(
+        path,
+        usecols=lambda column: column in USED_COLUMNS,
+        dtype={column: str for column in TEXT_COLUMNS},
+        chunksize=chunksize
+    )
 
 class ProductExtractor:
-    def __init__(self, csv_path: str):
-        self.csv_path = csv_path
+    def __init__(self, csv_path: Union[str, List[str]], max_workers: Optional[int] = None):
+        # Large exports come split into several files; their rows are read back in order
+        self.csv_paths = [csv_path] if isinstance(csv_path, str) else list(csv_path)
+        self.csv_path = self.csv_paths[0]
+        self.max_workers = max_workers
         self.products = {}
         self.raw_df = None
+        self.tag_index = {}  # normalized tag -> products in catalog order; None -> untagged products
+        self.tag_names = {}  # normalized tag -> spelling of its first occurrence
 
     def load_data(self) -> bool:
         try:
-            self.raw_df = pd.read_csv(self.csv_path)
+            # A product whose rows run past the end of one file continues in the next,
+            # so files are stacked before extraction rather than extracted separately
+            self.raw_df = read_csv_files(read_product_csv, self.csv_paths, self.max_workers)
             return True
         except Exception as e:
             print(f"Error loading CSV: {e}")
             return False
 
-    def extract_products(self) -> Dict[str, Dict]:
+    def extract_products(self, chunksize: Optional[int] = None) -> Dict[str, Product]:
+        if chunksize:
+            # Rows are read a chunk at a time and never held as one frame
+            products = {}
+            for product in self.iter_products(chunksize):
+                existing = products.get(product.handle)
+                if existing is None:
+                    products[product.handle] = product
+                else:
+                    # Only an export that is not grouped by handle repeats one
+                    existing.variants.extend(product.variants)
+                    existing.images.extend(product.images)
+            self.set_products(products)
+            return products
+
         if self.raw_df is None:
             self.load_data()
 
-        products = {}
+        products = self.build_products(self.raw_df.copy())
 
-        for _, row in self.raw_df.iterrows():
-            handle = row.get('Handle')
-            if pd.isna(handle):
-                continue
+        # The models hold everything the price book needs; the CSV frame is not kept around
+        self.raw_df = None
+        self.set_products(products)
+        return products
 
-            # Skip inactive products
-            status = row.get('Status', 'active')
-            if pd.notna(status) and str(status).lower() != 'active':
-                continue
+    def iter_products(self, chunksize: int = 10000) -> Iterator[Product]:
+        """Yield each product as soon as all of its rows have been read.
 
-            if handle not in products:
-                products[handle] = {
-                    'handle': handle,
-                    'title': row.get('Title', ''),
-                    'body_html': row.get('Body (HTML)', ''),
-                    'vendor': row.get('Vendor', ''),
-                    'product_category': row.get('Product Category', ''),
-                    'type': row.get('Type', ''),
-                    'tags': row.get('Tags', ''),
-                    'published': row.get('Published', True),
-                    'status': row.get('Status', 'active'),
-                    'variants': [],
-                    'images': []
-                }
-
-                if pd.notna(row.get('Image Src')):
-                    products[handle]['images'].append({
-                        'src': row.get('Image Src'),
-                        'position': row.get('Image Position', 1),
-                        'alt_text': row.get('Image Alt Text', '')
-                    })
-
-            # Only add variants if product is active (handle exists in products dict)
-            if handle in products and (pd.notna(row.get('Option1 Value')) or pd.notna(row.get('Variant SKU'))):
-                variant = {
-                    'sku': row.get('Variant SKU', ''),
-                    'price': row.get('Variant Price', 0),
-                    'compare_at_price': row.get('Variant Compare At Price', ''),
-                    'inventory_qty': row.get('Variant Inventory Qty', 0),
-                    'weight': row.get('Variant Grams', 0),
-                    'weight_unit': row.get('Variant Weight Unit', 'g'),
-                    'barcode': row.get('Variant Barcode', ''),
-                    'option1': row.get('Option1 Value', ''),
-                    'option2': row.get('Option2 Value', ''),
-                    'option3': row.get('Option3 Value', ''),
-                    'option1_name': row.get('Option1 Name', ''),
-                    'option2_name': row.get('Option2 Name', ''),
-                    'option3_name': row.get('Option3 Name', ''),
-                    'taxable': row.get('Variant Taxable', True),
-                    'requires_shipping': row.get('Variant Requires Shipping', True)
-                }
-                products[handle]['variants'].append(variant)
-
-            # Only add additional images if product is active (handle exists in products dict)
-            if handle in products and pd.notna(row.get('Image Src')) and row.get('Image Position', 1) > 1:
-                products[handle]['images'].append({
-                    'src': row.get('Image Src'),
-                    'position': row.get('Image Position', 1),
-                    'alt_text': row.get('Image Alt Text', '')
-                })
+        Shopify exports keep a product's variant and image rows together, so
+        a handle is complete once a later handle starts. Only the rows of the
+        product still open at the end of a chunk are carried over, also
+        across export files.
+        """
+        pending = None
+        for path in self.csv_paths:
+            for chunk in read_product_csv(path, chunksize=chunksize):
+                chunk = chunk[chunk['Handle'].notna()]
+                if pending is not None:
+                    chunk = pd.concat([pending, chunk], ignore_index=True)
+                if chunk.empty:
+                    continue
+
+                is_open = chunk['Handle'] == chunk['Handle'].iloc[-1]
+                pending = chunk[is_open]
+                yield from self.build_products(chunk[~is_open]).values()
+
+        if pending is not None:
+            yield from self.build_products(pending).values()
+
+    def build_products(self, df: pd.DataFrame) -> Dict[str, Product]:
+        for fields in (PRODUCT_COLUMNS, VARIANT_COLUMNS, IMAGE_COLUMNS):
+            for column, default in fields.values():
+                if column not in df.columns:
+                    df[column] = default
+
+        df = df[df['Handle'].notna()]
+
+        # Skip inactive products. Status is only set on the first row of each
+        # handle, so the whole product follows that row.
+        status = df['Status']
+        status_ok = status.isna() | (status.astype(str).str.lower() == 'active')
+        first_rows = ~df['Handle'].duplicated()
+        active_handles = df.loc[first_rows & status_ok, 'Handle']
+        df = df[status_ok & df['Handle'].isin(active_handles)]
+        first_rows = ~df['Handle'].duplicated()
+
+        heads = df[first_rows]
+        products = {
+            product.handle: product
+            for product in _records(heads, {'handle': ('Handle', ''), **PRODUCT_COLUMNS}, Product)
+        }
+
+        variant_rows = df[df['Option1 Value'].notna() | df['Variant SKU'].notna()]
+        for handle, variant in zip(variant_rows['Handle'], _records(variant_rows, VARIANT_COLUMNS, Variant)):
+            products[handle].variants.append(variant)
+
+        # The first row's image is the main one, later rows add positions > 1
+        image_rows = df[df['Image Src'].notna() & (first_rows | (df['Image Position'] > 1))]
+        for handle, image in zip(image_rows['Handle'], _records(image_rows, IMAGE_COLUMNS, ProductImage)):
+            products[handle].images.append(image)
 
-        self.products = products
         return products
 
-    def get_products_by_tag(self, tag: str) -> List[Dict]:
-        filtered = []
-        for handle, product in self.products.items():
-            tags = str(product.get('tags', '')).lower()
-            if tag.lower() in tags:
-                filtered.append(product)
-        return filtered
+    def set_products(self, products: Dict[str, Product]):
+        self.products = products
+        self.build_tag_index()
 
-    def get_all_tags(self) -> set:
-        tags = set()
+    def build_tag_index(self):
+        tag_index = {}
+        tag_names = {}
         for product in self.products.values():
-            product_tags = str(product.get('tags', ''))
-            if product_tags:
-                for tag in product_tags.split(','):
-                    tags.add(tag.strip())
-        return tags
+            if not product.tags:
+                tag_index.setdefault(None, []).append(product)
+                continue
+            for tag in product.tags:
+                key = normalize_tag(tag)
+                products = tag_index.get(key)
+                if products is None:
+                    products = tag_index[key] = []
+                    tag_names[key] = tag
+                # A product listing the same tag twice is still one entry
+                if not products or products[-1] is not product:
+                    products.append(product)
+
+        self.tag_index = tag_index
+        self.tag_names = tag_names
+
+    def get_products_by_tag(self, tag: str) -> List[Product]:
+        return list(self.tag_index.get(normalize_tag(tag), []))
+
+    def get_all_tags(self) -> set:
+        return set(self.tag_names.values())
 
-    def get_product_by_handle(self, handle: str) -> Optional[Dict]:
+    def get_product_by_handle(self, handle: str) -> Optional[Product]:
         return self.products.get(handle)
 
-    def group_products_by_tag(self) -> Dict[str, List[Dict]]:
+    def group_products_by_tag(self, tags: Optional[List[str]] = None) -> Dict[str, List[Product]]:
+        # Only the requested groups are built; without a list every tag gets one
         grouped = {}
-        for product in self.products.values():
-            product_tags = str(product.get('tags', ''))
-            if not product_tags:
-                if 'untagged' not in grouped:
-                    grouped['untagged'] = []
-                grouped['untagged'].append(product)
-            else:
-                for tag in product_tags.split(','):
-                    tag = tag.strip()
-                    if tag:
-                        if tag not in grouped:
-                            grouped[tag] = []
-                        grouped[tag].append(product)
-        return grouped
\ No newline at end of file
+        if tags is None:
+            for key, products in self.tag_index.items():
+                grouped['untagged' if key is None else self.tag_names[key]] = list(products)
+            return grouped
+
+        seen = set()
+        for tag in tags:
+            key = normalize_tag(tag)
+            if key in seen or key not in self.tag_index:
+                continue
+            seen.add(key)
+            grouped[tag] = list(self.tag_index[key])
+        return grouped
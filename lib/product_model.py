@@ -0,0 +1,98 @@
+import sys
+from typing import Any, Dict, List, Tuple
+
+class Record:
+    """Base for the slotted catalog records; one attribute per CSV field, no per-instance dict"""
+    __slots__ = ()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __eq__(self, other) -> bool:
+        return type(self) is type(other) and all(
+            getattr(self, field) == getattr(other, field) for field in self.__slots__
+        )
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f"{field}={getattr(self, field)!r}" for field in self.__slots__[:2])
+        return f"{type(self).__name__}({fields}, ...)"
+
+class Variant(Record):
+    __slots__ = ('sku', 'price', 'compare_at_price', 'inventory_qty', 'weight', 'weight_unit',
+                 'barcode', 'option1', 'option2', 'option3', 'option1_name', 'option2_name',
+                 'option3_name', 'taxable', 'requires_shipping')
+
+    def __init__(self, sku='', price=0, compare_at_price='', inventory_qty=0, weight=0, weight_unit='g',
+                 barcode='', option1='', option2='', option3='', option1_name='', option2_name='',
+                 option3_name='', taxable=True, requires_shipping=True):
+        self.sku = sku
+        self.price = price
+        self.compare_at_price = compare_at_price
+        self.inventory_qty = inventory_qty
+        self.weight = weight
+        self.weight_unit = weight_unit
+        self.barcode = barcode
+        self.option1 = option1
+        self.option2 = option2
+        self.option3 = option3
+        self.option1_name = option1_name
+        self.option2_name = option2_name
+        self.option3_name = option3_name
+        self.taxable = taxable
+        self.requires_shipping = requires_shipping
+
+class ProductImage(Record):
+    __slots__ = ('src', 'position', 'alt_text')
+
+    def __init__(self, src=None, position=1, alt_text=''):
+        self.src = src
+        self.position = position
+        self.alt_text = alt_text
+
+class Product(Record):
+    __slots__ = ('handle', 'title', 'body_html', 'vendor', 'product_category', 'type', 'tags',
+                 'published', 'status', 'variants', 'images')
+
+    def __init__(self, handle, title='', body_html='', vendor='', product_category='', type='',
+                 tags: Tuple[str, ...] = (), published=True, status='active',
+                 variants: List[Variant] = None, images: List[ProductImage] = None):
+        self.handle = handle
+        self.title = title
+        self.body_html = body_html
+        self.vendor = vendor
+        self.product_category = product_category
+        self.type = type
+        self.tags = tags
+        self.published = published
+        self.status = status
+        self.variants = variants if variants is not None else []
+        self.images = images if images is not None else []
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = super().to_dict()
+        data['tags'] = list(self.tags)
+        data['variants'] = [variant.to_dict() for variant in self.variants]
+        data['images'] = [image.to_dict() for image in self.images]
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Product':
+        fields = dict(data)
+        fields['tags'] = parse_tags(fields.get('tags', ()))
+        fields['variants'] = [Variant(**variant) for variant in fields.get('variants', [])]
+        fields['images'] = [ProductImage(**image) for image in fields.get('images', [])]
+        return cls(**fields)
+
+def intern_value(value):
+    # Options, units, vendors and tags repeat across thousands of rows; keep one copy of each
+    return sys.intern(value) if isinstance(value, str) else value
+
+def normalize_tag(tag: str) -> str:
+    # Tag matching ignores case and surrounding whitespace
+    return tag.strip().lower()
+
+def parse_tags(tags) -> Tuple[str, ...]:
+    if isinstance(tags, (list, tuple)):
+        return tuple(intern_value(tag) for tag in tags)
+    # Same split as the CSV's comma separated Tags column; a missing value reads as 'nan'
+    return tuple(sys.intern(tag.strip()) for tag in str(tags).split(',') if tag.strip())
@@ -0,0 +1,69 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict
+
+MANIFEST_VERSION = 2
+
+def fingerprint(value: Any) -> str:
+    # Canonical JSON so equal inputs always hash the same; NaN and other odd values go through str()
+    data = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+def file_fingerprint(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+class RunManifest:
+    def __init__(self, path: str = "outputs/manifest.json"):
+        self.path = path
+        self.data = {}
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"Could not read manifest {self.path}: {e}")
+            return
+
+        # Manifests from another format version can't be trusted for reuse
+        if data.get('version') == MANIFEST_VERSION:
+            self.data = data
+
+    def get_previous_output(self, run_fingerprint: str) -> str:
+        # A run whose images did not all load is not up to date, whatever its inputs
+        output = self.data.get('output')
+        if (self.data.get('run_fingerprint') == run_fingerprint and not self.data.get('failed_images')
+                and output and os.path.exists(output)):
+            return output
+        return ''
+
+    def get_previous_shards(self) -> Dict[str, str]:
+        # Shard fingerprint -> workbook from the last run that still exists and has every image
+        return {
+            shard['fingerprint']: shard['file']
+            for shard in self.data.get('shards', [])
+            if os.path.exists(shard.get('file', '')) and not shard.get('failed_images')
+        }
+
+    def save(self, run_fingerprint: str, output: str, shards: list = None, failed_images: list = None):
+        self.data = {
+            'version': MANIFEST_VERSION,
+            'run_fingerprint': run_fingerprint,
+            'output': output,
+            'failed_images': failed_images or [],
+            'shards': shards or []
+        }
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.path)
@@ -0,0 +1,86 @@
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+def max_rss_mb() -> Optional[float]:
+    # The process high-water mark so far; ru_maxrss is in bytes on macOS and kilobytes on Linux
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(max_rss / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+class RunMetrics:
+    """Wall time and memory per stage plus counters for one generator run.
+
+    Counters may be bumped from worker threads. Traced peak memory is only
+    recorded with trace_memory while tracemalloc is running, since it slows
+    Python-heavy stages.
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.stages = {}
+            self.counters = {}
+            self.started = time.time()
+            self.info = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        # Stages are not nested; each one starts from a fresh traced peak
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+
+        start = time.perf_counter()
+        rss_before = max_rss_mb()
+        try:
+            yield
+        finally:
+            stage = self.stages.setdefault(name, {'seconds': 0.0})
+            stage['seconds'] = round(stage['seconds'] + time.perf_counter() - start, 4)
+            # ru_maxrss never goes down, so a stage can only be charged for raising it
+            rss_after = max_rss_mb()
+            if rss_after is not None:
+                stage['process_max_rss_mb'] = rss_after
+                stage['max_rss_growth_mb'] = round(stage.get('max_rss_growth_mb', 0) + rss_after - rss_before, 1)
+            if tracing:
+                peak = round(tracemalloc.get_traced_memory()[1] / 1e6, 2)
+                stage['peak_traced_mb'] = max(stage.get('peak_traced_mb', 0), peak)
+
+    def count(self, name: str, amount: int = 1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def add_counts(self, counts: Dict[str, int]):
+        for name, amount in counts.items():
+            self.count(name, amount)
+
+    def to_dict(self) -> Dict:
+        return {
+            **self.info,
+            'started': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started)),
+            'total_seconds': round(time.time() - self.started, 4),
+            'max_rss_mb': max_rss_mb(),
+            'stages': self.stages,
+            'counters': dict(sorted(self.counters.items())),
+        }
+
+    def write(self, path: str):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
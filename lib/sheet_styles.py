@@ -0,0 +1,76 @@
+from copy import copy
+from openpyxl.styles import Font, Alignment, Border, Side, PatternFill, NamedStyle
+from openpyxl.styles.fonts import DEFAULT_FONT
+from typing import Dict, Tuple
+
+PRODUCT_FONT = dict(color="2C3E50", size=14)
+
+# Column kind -> (font, alignment) for product rows
+PRODUCT_COLUMN_STYLES = {
+    'image': (None, dict(horizontal='center', vertical='center')),
+    'sku': (PRODUCT_FONT, dict(horizontal='center', vertical='center', wrap_text=True)),
+    'name': (PRODUCT_FONT, dict(horizontal='left', vertical='center', wrap_text=True)),
+    'variant': (PRODUCT_FONT, dict(horizontal='left', vertical='center', wrap_text=True)),
+    'price': (PRODUCT_FONT, dict(horizontal='right', vertical='center')),
+}
+
+ROW_POSITIONS = ('first', 'middle', 'last', 'only')
+
+ROW_FILLS = {
+    'even': "FFFFFF",
+    'odd': "F8F9FA",
+}
+
+def row_position(variant_idx: int, variant_count: int) -> str:
+    if variant_count == 1:
+        return 'only'
+    if variant_idx == 0:
+        return 'first'
+    if variant_idx == variant_count - 1:
+        return 'last'
+    return 'middle'
+
+def product_border(position: str) -> Border:
+    # Thicker border for product boundaries, thin between variants of one product
+    edge = Side(style='medium', color="4A6FA5")
+    inner = Side(style='thin', color="E0E0E0")
+    return Border(
+        left=edge,
+        right=edge,
+        top=edge if position in ('first', 'only') else inner,
+        bottom=edge if position in ('last', 'only') else inner
+    )
+
+class StylePalette:
+    """Named styles for product rows, built once and registered once per workbook"""
+
+    def __init__(self, wb):
+        self.wb = wb
+        self.names = {}  # (column kind, row position, parity) -> style name
+        self.styles = self.build_product_styles()
+
+    @staticmethod
+    def build_product_styles() -> Dict[Tuple[str, str, str], NamedStyle]:
+        styles = {}
+        for kind, (font, alignment) in PRODUCT_COLUMN_STYLES.items():
+            for position in ROW_POSITIONS:
+                for parity, color in ROW_FILLS.items():
+                    style = NamedStyle(
+                        name=f"Price Book {kind} {position} {parity}",
+                        border=product_border(position),
+                        fill=PatternFill(start_color=color, end_color=color, fill_type="solid"),
+                        alignment=Alignment(**alignment),
+                        font=Font(**font) if font else copy(DEFAULT_FONT)
+                    )
+                    styles[(kind, position, parity)] = style
+        return styles
+
+    def product_style(self, kind: str, position: str, parity: str) -> str:
+        key = (kind, position, parity)
+        name = self.names.get(key)
+        if name is None:
+            # Only combinations that are used end up in the workbook's style list
+            style = self.styles[key]
+            self.wb.add_named_style(style)
+            name = self.names[key] = style.name
+        return name
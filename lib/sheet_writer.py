@@ -0,0 +1,103 @@
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.worksheet.cell_range import CellRange
+from openpyxl.worksheet.merge import MergedCellRange
+from openpyxl.worksheet.pagebreak import Break
+from lib.workbook_writer import save_workbook
+
+class SheetWriter:
+    """Renderer-facing sheet backed by a regular openpyxl worksheet kept in memory until save()"""
+
+    def __init__(self, title: str = "Price List"):
+        self.wb = Workbook()
+        self.ws = self.wb.active
+        self.ws.title = title
+
+    def cell(self, row: int, column: int, value=None):
+        return self.ws.cell(row=row, column=column, value=value)
+
+    def set_row_height(self, row: int, height: float):
+        self.ws.row_dimensions[row].height = height
+
+    def set_column_width(self, column: str, width: float):
+        self.ws.column_dimensions[column].width = width
+
+    def merge_cells(self, range_string: str):
+        # The renderer never writes overlapping ranges, so skip Worksheet.merge_cells'
+        # overlap scan, which is linear in the number of merged ranges so far
+        # (merged_cells.ranges is a set from openpyxl 3.1 on, see requirements.txt)
+        mcr = MergedCellRange(self.ws, range_string)
+        self.ws.merged_cells.ranges.add(mcr)
+        self.ws._clean_merge_range(mcr)
+
+    def add_image(self, img, anchor: str):
+        self.ws.add_image(img, anchor)
+
+    def add_row_break(self, row: int):
+        self.ws.row_breaks.append(Break(id=row))
+
+    def flush(self, row: int):
+        # Rows before `row` are complete; nothing to do while the sheet is in memory
+        pass
+
+    def save(self, filename: str):
+        save_workbook(self.wb, filename)
+
+    def rows_written(self) -> int:
+        return self.ws.max_row
+
+    def stats(self) -> dict:
+        images = self.ws._images
+        return {
+            'rows_written': self.rows_written(),
+            'merges_written': len(self.ws.merged_cells.ranges),
+            'images_written': len(images),
+            # Images sharing a media key are stored once by the workbook writer
+            'image_media_written': len({getattr(img, 'media_key', None) or id(img) for img in images}),
+        }
+
+
+class StreamingSheetWriter(SheetWriter):
+    """Write-only sheet that streams each completed row to disk.
+
+    Cells are buffered only for rows that are still being rendered, so memory
+    stays bounded by the largest product rather than by the whole catalog.
+    Column widths must be set before the first row is flushed.
+    """
+
+    def __init__(self, title: str = "Price List"):
+        self.wb = Workbook(write_only=True)
+        self.ws = self.wb.create_sheet(title)
+        self.rows = {}  # row -> column -> pending cell
+        self.next_row = 1
+
+    def cell(self, row: int, column: int, value=None):
+        if row < self.next_row:
+            raise ValueError(f"Row {row} has already been written")
+
+        cells = self.rows.setdefault(row, {})
+        cell = cells.get(column)
+        if cell is None:
+            cell = cells[column] = WriteOnlyCell(self.ws)
+        if value is not None:
+            cell.value = value
+        return cell
+
+    def merge_cells(self, range_string: str):
+        self.ws.merged_cells.ranges.add(CellRange(range_string))
+
+    def flush(self, row: int):
+        for row_idx in range(self.next_row, row):
+            cells = self.rows.pop(row_idx, {})
+            self.ws.append([cells.get(column) for column in range(1, max(cells, default=0) + 1)])
+
+            # The row's height has been written with it
+            self.ws.row_dimensions.pop(row_idx, None)
+        self.next_row = max(self.next_row, row)
+
+    def save(self, filename: str):
+        self.flush(max(self.rows, default=0) + 1)
+        save_workbook(self.wb, filename)
+
+    def rows_written(self) -> int:
+        return self.next_row - 1
@@ -1,81 +1,143 @@
 import pandas as pd
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Union
 import os
+from lib.csv_loader import read_csv_files
+
+# Column -> default when the export does not have it; Market and Status are never read
+TRANSLATION_COLUMNS = {
+    'Type': None,
+    'Identification': '',
+    'Field': '',
+    'Locale': '',
+    'Default content': '',
+    'Translated content': '',
+}
+
+# What the price book renderer reads from the translation export
+PRICE_BOOK_TYPES = {'PRODUCT'}
+PRICE_BOOK_FIELDS = {'handle', 'title'}
 
 class TranslationExtractor:
-    def __init__(self, csv_path: Optional[str] = None):
-        self.csv_path = csv_path
+    def __init__(self, csv_path: Union[str, List[str], None] = None, locales: Optional[Iterable[str]] = None,
+                 types: Optional[Iterable[str]] = None, fields: Optional[Iterable[str]] = None,
+                 chunksize: int = 20000, max_workers: Optional[int] = None):
+        self.csv_paths = [csv_path] if isinstance(csv_path, str) else list(csv_path or [])
+        self.csv_path = self.csv_paths[0] if self.csv_paths else None
+        self.max_workers = max_workers
+        # None keeps everything, otherwise only rows matching these values are loaded
+        self.locales = set(locales) if locales is not None else None
+        self.types = set(types) if types is not None else None
+        self.fields = set(fields) if fields is not None else None
+        self.chunksize = chunksize
         self.translations = {}
         self.raw_df = None
+        self.handle_index = {}  # locale -> product handle -> product id
+        self.title_index = {}  # locale -> normalized default title -> translated title
 
     def load_data(self) -> bool:
-        if not self.csv_path or not os.path.exists(self.csv_path):
-            print(f"Translation file not found: {self.csv_path}")
+        missing = [path for path in self.csv_paths if not os.path.exists(path)]
+        if not self.csv_paths or missing:
+            print(f"Translation file not found: {missing[0] if missing else self.csv_path}")
             return False
 
         try:
-            self.raw_df = pd.read_csv(self.csv_path)
+            self.raw_df = read_csv_files(self.read_file, self.csv_paths, self.max_workers)
             return True
         except Exception as e:
             print(f"Error loading translation CSV: {e}")
             return False
 
+    def read_file(self, path: str) -> pd.DataFrame:
+        # Filter chunk by chunk so memory follows the rows we keep, not the export size
+        reader = pd.read_csv(
+            path,
+            usecols=lambda column: column in TRANSLATION_COLUMNS,
+            chunksize=self.chunksize
+        )
+        chunks = [self.filter_rows(chunk) for chunk in reader]
+        if chunks:
+            return pd.concat(chunks, ignore_index=True)
+        return pd.DataFrame(columns=list(TRANSLATION_COLUMNS))
+
+    def filter_rows(self, df: pd.DataFrame) -> pd.DataFrame:
+        for column, default in TRANSLATION_COLUMNS.items():
+            if column not in df.columns:
+                df[column] = default
+
+        mask = df['Type'].notna()
+        if self.types is not None:
+            mask &= df['Type'].isin(self.types)
+        if self.locales is not None:
+            mask &= df['Locale'].isin(self.locales)
+        if self.fields is not None:
+            mask &= df['Field'].isin(self.fields)
+        return df[mask]
+
     def extract_translations(self) -> Dict:
         if self.raw_df is None:
             if not self.load_data():
                 return {}
 
-        translations = {}
-
-        for _, row in self.raw_df.iterrows():
-            item_type = row.get('Type', '')
-            identification = str(row.get('Identification', ''))
-            field = row.get('Field', '')
-            locale = row.get('Locale', '')
-            default_content = row.get('Default content', '')
-            translated_content = row.get('Translated content', '')
-
-            if pd.isna(item_type) or pd.isna(identification):
-                continue
-
-            item_id = identification.split(',')[0].strip("'")
-
-            if item_type not in translations:
-                translations[item_type] = {}
-
-            if item_id not in translations[item_type]:
-                translations[item_type][item_id] = {}
-
-            if locale not in translations[item_type][item_id]:
-                translations[item_type][item_id][locale] = {}
-
-            if field not in translations[item_type][item_id][locale]:
-                translations[item_type][item_id][locale][field] = {}
+        df = self.raw_df
+        item_ids = df['Identification'].astype(str).str.split(',').str[0].str.strip("'")
 
-            translations[item_type][item_id][locale][field] = {
+        translations = {}
+        for item_type, item_id, locale, field, default_content, translated_content in zip(
+            df['Type'].tolist(),
+            item_ids.tolist(),
+            df['Locale'].tolist(),
+            df['Field'].tolist(),
+            df['Default content'].tolist(),
+            df['Translated content'].tolist()
+        ):
+            item = translations.setdefault(item_type, {}).setdefault(item_id, {})
+            item.setdefault(locale, {})[field] = {
                 'default': default_content,
                 'translated': translated_content
             }
 
         self.translations = translations
+        self.build_indexes()
         return translations
 
+    def build_indexes(self):
+        handle_index = {}
+        title_index = {}
+
+        for product_id, locales in self.translations.get('PRODUCT', {}).items():
+            for locale, fields in locales.items():
+                handle = fields.get('handle', {}).get('default')
+                if isinstance(handle, str):
+                    # First product with a handle wins, as the old linear scan did
+                    handle_index.setdefault(locale, {}).setdefault(handle, product_id)
+
+                title = fields.get('title', {})
+                default_title = title.get('default')
+                translated = title.get('translated')
+                if isinstance(default_title, str) and isinstance(translated, str) and translated:
+                    title_index.setdefault(locale, {}).setdefault(
+                        self.normalize_title(default_title), translated
+                    )
+
+        self.handle_index = handle_index
+        self.title_index = title_index
+
+    @staticmethod
+    def normalize_title(title: str) -> str:
+        return title.strip().lower()
+
     def get_product_translations(self, product_handle: str, locale: str) -> Dict:
-        if 'PRODUCT' not in self.translations:
+        product_id = self.handle_index.get(locale, {}).get(product_handle)
+        if product_id is None:
             return {}
-
-        for product_id, locales in self.translations['PRODUCT'].items():
-            if locale in locales:
-                if 'handle' in locales[locale]:
-                    handle_data = locales[locale]['handle']
-                    if handle_data.get('default') == product_handle:
-                        return locales[locale]
-        return {}
+        return self.translations['PRODUCT'][product_id][locale]
 
     def get_translated_title(self, product_handle: str, locale: str) -> Optional[str]:
         translations = self.get_product_translations(product_handle, locale)
         if 'title' in translations:
-            return translations['title'].get('translated', '')
+            translated = translations['title'].get('translated', '')
+            # Untranslated titles come through as NaN from the CSV
+            return translated if isinstance(translated, str) else None
         return None
 
     def get_variant_translations(self, variant_id: str, locale: str) -> Dict:
@@ -117,13 +179,8 @@ class TranslationExtractor:
                 if translated:
                     name_parts.append(translated)
                 elif lang != "default":
-                    for product_id, locales in self.translations.get('PRODUCT', {}).items():
-                        if lang in locales and 'title' in locales[lang]:
-                            title_info = locales[lang]['title']
-                            if title_info.get('default', '').lower() == default_name.lower():
-                                trans = title_info.get('translated', '')
-                                if trans:
-                                    name_parts.append(trans)
-                                    break
+                    trans = self.title_index.get(lang, {}).get(self.normalize_title(str(default_name)))
+                    if trans:
+                        name_parts.append(trans)
 
         return " ".join(name_parts) if name_parts else default_name
\ No newline at end of file
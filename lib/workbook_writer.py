@@ -0,0 +1,53 @@
+import datetime
+from zipfile import ZipFile, ZIP_DEFLATED
+from openpyxl.packaging.relationship import get_rels_path
+from openpyxl.drawing.image import Image as XLImage
+from openpyxl.writer.excel import ExcelWriter
+from openpyxl.xml.functions import tostring
+
+class BufferedImage(XLImage):
+    """Worksheet image backed by already encoded bytes instead of a file"""
+
+    def __init__(self, data: bytes, image_format: str, width: int, height: int, media_key: str = None):
+        self.ref = data
+        self.format = 'jpeg' if image_format.lower() == 'jpg' else image_format.lower()
+        self.width = width
+        self.height = height
+        self.media_key = media_key
+
+    def _data(self):
+        return self.ref
+
+
+class DedupingExcelWriter(ExcelWriter):
+    """ExcelWriter that stores images sharing a media_key only once in xl/media"""
+
+    def __init__(self, workbook, archive):
+        super().__init__(workbook, archive)
+        self._media_ids = {}
+
+    def _write_drawing(self, drawing):
+        self._drawings.append(drawing)
+        drawing._id = len(self._drawings)
+        for chart in drawing.charts:
+            self._charts.append(chart)
+            chart._id = len(self._charts)
+        for img in drawing.images:
+            # Anchors with the same media key point at the first copy's media part
+            key = getattr(img, 'media_key', None) or id(img)
+            if key not in self._media_ids:
+                self._images.append(img)
+                self._media_ids[key] = len(self._images)
+            img._id = self._media_ids[key]
+        rels_path = get_rels_path(drawing.path)[1:]
+        self._archive.writestr(drawing.path[1:], tostring(drawing._write()))
+        self._archive.writestr(rels_path, tostring(drawing._write_rels()))
+        self.manifest.append(drawing)
+
+
+def save_workbook(workbook, filename: str) -> bool:
+    archive = ZipFile(filename, 'w', ZIP_DEFLATED, allowZip64=True)
+    workbook.properties.modified = datetime.datetime.now(tz=datetime.timezone.utc).replace(tzinfo=None)
+    writer = DedupingExcelWriter(workbook, archive)
+    writer.save()
+    return True
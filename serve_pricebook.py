@@ -0,0 +1,353 @@
+"""Local HTTP service that generates price books on demand from warm, in-memory catalog data.
+
+Usage: python serve_pricebook.py [--port 8000] [--workers 2] [--queue 16] [--config config.json]
+
+POST /pricebooks              JSON body of config overrides, e.g. {"target_tag": [...], "target_language": [...]};
+                              answers 202 with the job, or waits and returns the file with ?wait=1
+GET  /pricebooks              All known jobs
+GET  /pricebooks/<id>         Job status: queued, running, done or failed
+GET  /pricebooks/<id>/file    The generated price book once the job is done
+GET  /status                  Queue, workers and warm cache sizes
+"""
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from generate_pricebook import PriceBookGenerator, IMAGE_ENCODING_KEYS, RENDER_CONFIG_KEYS
+from lib.run_manifest import fingerprint
+from watch_pricebook import input_snapshot
+
+# Settings a request may override; everything else, including file paths, comes from config.json.
+# image_cdn_resize is a download setting of the shared fetcher, so it cannot change per request.
+REQUEST_CONFIG_KEYS = ((set(RENDER_CONFIG_KEYS) - {'logo', 'image_cdn_resize'})
+                       | {'target_tag', 'output_format', 'streaming_workbook'})
+
+CONTENT_TYPES = {
+    '.xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    '.html': 'text/html; charset=utf-8',
+}
+
+class Job:
+    def __init__(self, job_id: str, key: str, overrides: Dict):
+        self.id = job_id
+        self.key = key
+        self.overrides = overrides
+        self.status = 'queued'
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.output_file = None
+        self.error = None
+        self.report = None
+        self.done = threading.Event()
+
+    def to_dict(self) -> Dict:
+        return {
+            'id': self.id,
+            'status': self.status,
+            'overrides': self.overrides,
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.created)),
+            'queued_seconds': round((self.started or time.time()) - self.created, 3),
+            'run_seconds': round((self.finished or time.time()) - self.started, 3) if self.started else None,
+            'file_url': f"/pricebooks/{self.id}/file" if self.status == 'done' else None,
+            'error': self.error,
+            'stages': self.report['stages'] if self.report else None,
+            'counters': self.report['counters'] if self.report else None,
+        }
+
+class PriceBookService:
+    """Runs generation jobs on a fixed set of worker threads fed by a bounded queue.
+
+    Parsed products and translations live in one long-lived generator and are
+    only re-parsed when the input exports change; downloaded thumbnails and
+    their encodings are shared by all jobs. A request identical to one that is
+    still queued or running joins that job instead of starting another.
+    """
+
+    def __init__(self, config_path: str = "config.json", workers: int = 2, queue_size: int = 16,
+                 history: int = 100):
+        self.config_path = config_path
+        with open(config_path, 'r', encoding='utf-8') as f:
+            self.base_config = json.load(f)
+        self.worker_count = max(1, int(workers))
+        self.queue = queue.Queue(maxsize=max(1, int(queue_size)))
+        self.history = history
+        self.output_dir = "outputs/service"
+
+        self.jobs = OrderedDict()  # job id -> Job, oldest first
+        self.in_flight = {}  # request key -> queued or running Job
+        self.lock = threading.Lock()
+
+        self.catalog = None  # Generator holding the parsed extractors and the shared image fetcher
+        self.locales = []
+        self.files = {}
+        self.catalog_lock = threading.Lock()
+        self.fetch_lock = threading.Lock()
+        self.image_data = {}  # Encoding settings -> image URL -> encoded thumbnail
+        self.started = time.time()
+
+    def start(self):
+        # Parse the catalog up front so the first request is as fast as the rest
+        self.get_catalog([])
+        for idx in range(self.worker_count):
+            threading.Thread(target=self.work, name=f"pricebook-worker-{idx + 1}", daemon=True).start()
+
+    def submit(self, overrides: Dict) -> Tuple[Job, bool]:
+        unknown = sorted(set(overrides) - REQUEST_CONFIG_KEYS)
+        if unknown:
+            raise ValueError(f"Settings that cannot be overridden per request: {', '.join(unknown)}")
+
+        key = fingerprint(overrides)
+        with self.lock:
+            job = self.in_flight.get(key)
+            if job:
+                return job, True
+
+            job = Job(uuid.uuid4().hex[:12], key, overrides)
+            self.queue.put_nowait(job)  # queue.Full when the queue is at capacity
+            self.jobs[job.id] = job
+            self.in_flight[key] = job
+            self.prune_jobs()
+        return job, False
+
+    def get_job(self, job_id: str) -> Optional[Job]:
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def prune_jobs(self):
+        # Forget the oldest finished jobs and their files beyond the history limit
+        finished = [job for job in self.jobs.values() if job.done.is_set()]
+        for job in finished[:max(0, len(self.jobs) - self.history)]:
+            del self.jobs[job.id]
+            if job.output_file and os.path.exists(job.output_file):
+                os.remove(job.output_file)
+
+    def work(self):
+        while True:
+            job = self.queue.get()
+            job.status = 'running'
+            job.started = time.time()
+            try:
+                job.output_file = self.run_job(job)
+                job.status = 'done'
+            except Exception as e:
+                print(f"Job {job.id} failed: {e}")
+                job.error = str(e)
+                job.status = 'failed'
+            finally:
+                job.finished = time.time()
+                with self.lock:
+                    if self.in_flight.get(job.key) is job:
+                        del self.in_flight[job.key]
+                job.done.set()
+                self.queue.task_done()
+
+    def get_catalog_config(self) -> Dict:
+        # Worker and HTTP threads are already running when the catalog is parsed or images fetched,
+        # and forking a pool from a threaded process can hand the children a lock some other thread
+        # holds, so images are decoded in the download threads and CSV files parsed one after another
+        return {**self.base_config, 'image_decode_processes': 1, 'parse_processes': 1}
+
+    def get_catalog(self, locales: List[str]):
+        # Re-parse only the exports that changed since the last job, and translations for new locales
+        with self.catalog_lock:
+            files = input_snapshot(self.config_path)
+            changed = {kind for kind in files if files[kind] != self.files.get(kind)}
+            if self.catalog and 'config' in changed:
+                try:
+                    with open(self.config_path, 'r', encoding='utf-8') as f:
+                        self.base_config = json.load(f)
+                except (OSError, ValueError) as e:
+                    print(f"Could not read {self.config_path}, keeping the previous settings: {e}")
+
+            if self.catalog is None:
+                self.catalog = PriceBookGenerator(config=self.get_catalog_config())
+                self.catalog.keep_warm = True
+            if 'products' in changed:
+                self.catalog.product_extractor = None
+            new_locales = [locale for locale in locales if locale not in self.locales]
+            if 'translations' in changed or new_locales:
+                self.catalog.translation_extractor = None
+            self.locales += new_locales
+
+            self.catalog.config = {**self.get_catalog_config(), 'target_language': ['default'] + self.locales}
+            self.catalog.initialize_extractors()
+            self.files = files
+            return self.catalog.product_extractor, self.catalog.translation_extractor
+
+    def run_job(self, job: Job) -> str:
+        config = {**self.base_config, **job.overrides}
+        locales = [lang for lang in config.get('target_language', ['default']) if lang and lang != 'default']
+        product_extractor, translation_extractor = self.get_catalog(locales)
+
+        generator = PriceBookGenerator(config=config, image_fetcher=self.catalog.image_fetcher)
+        generator.keep_warm = True
+        generator.product_extractor = product_extractor
+        generator.translation_extractor = translation_extractor
+        grouped_products = generator.get_grouped_products()
+
+        if config.get('output_format', 'xlsx') == 'html':
+            output_file = os.path.join(self.output_dir, f"pricebook_{job.id}.html")
+            generator.render_html(grouped_products, output_file)
+        else:
+            os.makedirs(self.output_dir, exist_ok=True)
+            output_file = os.path.join(self.output_dir, f"pricebook_{job.id}.xlsx")
+            encoding = fingerprint([config.get(key) for key in IMAGE_ENCODING_KEYS])
+
+            # One prefetch at a time: the fetcher's time budget and cache index are per prefetch
+            with self.fetch_lock, generator.metrics.stage('fetch_images'):
+                # The shared fetcher counts into this job's report for the length of its prefetch
+                fetcher = self.catalog.image_fetcher
+                catalog_metrics, fetcher.metrics = fetcher.metrics, generator.metrics
+                try:
+                    generator.prefetch_images(grouped_products)
+                finally:
+                    fetcher.metrics = catalog_metrics
+                image_data = self.image_data.setdefault(encoding, {})
+                # Images that got the placeholder last time are tried again. Other jobs may be rendering
+                # from this dict; get_image_data treats a URL popped under it as not yet encoded
+                for url in list(image_data):
+                    if url not in self.catalog.image_fetcher.thumbnails:
+                        image_data.pop(url, None)
+            generator.image_data = image_data
+            generator.render_workbook(grouped_products, output_file)
+
+        job.report = generator.metrics.to_dict()
+        return output_file
+
+    def status(self) -> Dict:
+        with self.lock:
+            counts = {}
+            for job in self.jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+        catalog = self.catalog
+        products = catalog.product_extractor.products if catalog and catalog.product_extractor else {}
+        return {
+            'uptime_seconds': round(time.time() - self.started, 1),
+            'workers': self.worker_count,
+            'queue': {'length': self.queue.qsize(), 'capacity': self.queue.maxsize},
+            'jobs': counts,
+            'catalog': {
+                'products': len(products),
+                'locales': self.locales,
+                'thumbnails': len(catalog.image_fetcher.thumbnails) if catalog else 0,
+                'encoded_images': sum(len(images) for images in self.image_data.values()),
+            },
+        }
+
+def make_handler(service: PriceBookService):
+    class Handler(BaseHTTPRequestHandler):
+        def send_json(self, status: int, data, headers: Optional[Dict] = None):
+            body = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def send_file(self, job: Job):
+            if job.status != 'done':
+                self.send_json(409, {'error': f"Job is {job.status}", 'job': job.to_dict()})
+                return
+            with open(job.output_file, 'rb') as f:
+                data = f.read()
+            name = os.path.basename(job.output_file)
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPES.get(os.path.splitext(name)[1], 'application/octet-stream'))
+            self.send_header('Content-Disposition', f'attachment; filename="{name}"')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            parts = [part for part in urlparse(self.path).path.split('/') if part]
+            if parts == ['status']:
+                self.send_json(200, service.status())
+            elif parts == ['pricebooks']:
+                with service.lock:
+                    jobs = [job.to_dict() for job in service.jobs.values()]
+                self.send_json(200, jobs)
+            elif len(parts) in (2, 3) and parts[0] == 'pricebooks':
+                job = service.get_job(parts[1])
+                if job is None:
+                    self.send_json(404, {'error': "Unknown job"})
+                elif len(parts) == 2:
+                    self.send_json(200, job.to_dict())
+                elif parts[2] == 'file':
+                    self.send_file(job)
+                else:
+                    self.send_json(404, {'error': "Not found"})
+            else:
+                self.send_json(404, {'error': "Not found"})
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            if url.path.rstrip('/') != '/pricebooks':
+                self.send_json(404, {'error': "Not found"})
+                return
+
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                overrides = json.loads(self.rfile.read(length) or b'{}')
+                if not isinstance(overrides, dict):
+                    raise ValueError("The request body must be a JSON object of settings")
+                job, deduplicated = service.submit(overrides)
+            except queue.Full:
+                self.send_json(503, {'error': "The job queue is full, try again later"}, {'Retry-After': '10'})
+                return
+            except ValueError as e:
+                self.send_json(400, {'error': str(e)})
+                return
+
+            if parse_qs(url.query).get('wait', ['0'])[0] not in ('0', 'false', ''):
+                job.done.wait()
+                if job.status == 'done':
+                    self.send_file(job)
+                else:
+                    self.send_json(500, job.to_dict())
+                return
+
+            self.send_json(202, {**job.to_dict(), 'deduplicated': deduplicated},
+                           {'Location': f"/pricebooks/{job.id}"})
+
+    return Handler
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--config', default="config.json")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=2, help="Jobs generated at the same time")
+    parser.add_argument('--queue', type=int, default=16, help="Jobs that may wait; more are refused with 503")
+    args = parser.parse_args()
+
+    service = PriceBookService(args.config, args.workers, args.queue)
+    print("Loading catalog...")
+    service.start()
+
+    httpd = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+    httpd.daemon_threads = True
+    print(f"Serving price books on http://{args.host}:{args.port}")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        service.catalog.image_fetcher.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import json
+import os
+import sys
+import time
+from typing import Dict, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from generate_pricebook import PriceBookGenerator, IMAGE_ENCODING_KEYS
+
+INPUT_DIRS = {
+    'products': "inputs/shopify_product_csv",
+    'translations': "inputs/shopify_translate_csv",
+}
+
+class PriceBookWatcher:
+    """Regenerates the price book whenever an input export or the config changes.
+
+    One generator stays alive between runs, so parsed products and translations
+    and every downloaded and encoded thumbnail are kept in memory. A change to
+    the product files re-parses products only, a change to the translation
+    files or to target_language re-parses translations only.
+    """
+
+    def __init__(self, config_path: str = "config.json", interval: Optional[float] = None):
+        self.config_path = config_path
+        self.config = self.load_config()
+        self.interval = interval or self.config.get('watch_interval', 2)
+        self.generator = None
+        self.files = {}
+
+    def load_config(self) -> Dict:
+        with open(self.config_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def snapshot(self) -> Dict[str, Dict[str, Tuple[int, int]]]:
+        return input_snapshot(self.config_path)
+
+    def wait_until_settled(self, files: Dict) -> Dict:
+        # Exports are copied in over several seconds; wait until a poll sees no further change
+        while True:
+            time.sleep(self.interval)
+            current = self.snapshot()
+            if current == files:
+                return current
+            files = current
+
+    def apply_changes(self, changed: set):
+        if 'config' in changed:
+            try:
+                config = self.load_config()
+            except (OSError, ValueError) as e:
+                print(f"Could not read {self.config_path}, keeping the previous settings: {e}")
+                config = self.config
+            languages_changed = config.get('target_language') != self.config.get('target_language')
+            encoding_changed = any(config.get(key) != self.config.get(key) for key in IMAGE_ENCODING_KEYS)
+            self.config = config
+
+            # A fresh generator picks up every setting; parsed data and thumbnails carry over
+            previous = self.generator
+            self.generator = self.create_generator()
+            self.generator.product_extractor = previous.product_extractor
+            self.generator.image_fetcher.thumbnails = previous.image_fetcher.thumbnails
+            if not languages_changed:
+                self.generator.translation_extractor = previous.translation_extractor
+            if not encoding_changed:
+                self.generator.image_data = previous.image_data
+            previous.image_fetcher.close()
+
+        if 'products' in changed:
+            self.generator.product_extractor = None
+        if 'translations' in changed:
+            self.generator.translation_extractor = None
+
+    def create_generator(self) -> PriceBookGenerator:
+        generator = PriceBookGenerator(config=self.config)
+        generator.keep_warm = True
+        return generator
+
+    def generate(self, reason: str):
+        print(f"[{time.strftime('%H:%M:%S')}] {reason}, generating price book...")
+        start = time.perf_counter()
+        try:
+            output_file = self.generator.generate()
+        except Exception as e:
+            # A half-written or malformed export should not end the watch; the next change retries
+            print(f"Price book generation failed: {e}")
+            self.generator.product_extractor = None
+            self.generator.translation_extractor = None
+            return
+        print(f"[{time.strftime('%H:%M:%S')}] {output_file} written in {time.perf_counter() - start:.1f}s")
+
+    def watch(self):
+        self.generator = self.create_generator()
+        self.files = self.snapshot()
+        self.generate("Starting")
+
+        print(f"Watching {', '.join(INPUT_DIRS.values())} and {self.config_path} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(self.interval)
+                files = self.snapshot()
+                if files == self.files:
+                    continue
+
+                files = self.wait_until_settled(files)
+                changed = {kind for kind in files if files[kind] != self.files[kind]}
+                self.files = files
+                self.apply_changes(changed)
+                self.generate(f"Changed: {', '.join(sorted(changed))}")
+        except KeyboardInterrupt:
+            print("Stopped watching")
+        finally:
+            self.generator.image_fetcher.close()
+
+def file_signature(path: str) -> Tuple[int, int]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return (0, 0)
+    return (stat.st_size, stat.st_mtime_ns)
+
+def input_snapshot(config_path: str = "config.json") -> Dict[str, Dict[str, Tuple[int, int]]]:
+    # Size and modification time of every input export and the config, by kind
+    files = {kind: {} for kind in INPUT_DIRS}
+    for kind, directory in INPUT_DIRS.items():
+        if os.path.isdir(directory):
+            for name in os.listdir(directory):
+                if name.endswith('.csv'):
+                    files[kind][name] = file_signature(os.path.join(directory, name))
+    files['config'] = {config_path: file_signature(config_path)}
+    return files
+
+def main():
+    config_path = sys.argv[1] if len(sys.argv) > 1 else "config.json"
+    PriceBookWatcher(config_path).watch()
+
+if __name__ == "__main__":
+    main()